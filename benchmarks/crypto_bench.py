@@ -0,0 +1,292 @@
+import os, sys, json, time, shutil, argparse, platform, statistics, subprocess, tempfile
+
+# Throughput and overhead of the crypto paths, split into the parts that can
+# regress independently:
+#   kdf      PBKDF2 key derivation (engine, same parameters as the tools)
+#   cipher   raw AES-256-CBC / GCM over in-memory buffers, per buffer size
+#   tools    encryptor/decryptor binaries and the engine on real files,
+#            per file size and -b buffer size
+#   spawn    cost of starting a binary (usage run, no crypto)
+#   batch    many small files through jobs.Batch, per file count
+#   signals  Qt signal delivery from a worker thread and Worker overhead
+#            on top of a bare jobs.run_tool call (skipped without PyQt5)
+#
+#   python benchmarks/crypto_bench.py -o before.json
+#   python benchmarks/crypto_bench.py --sizes 1K,1M,256M,4G --buffers 64K,1M,8M
+#   python benchmarks/crypto_bench.py -o after.json --compare before.json
+#
+# Every measurement is repeated and the median kept; --compare exits 1 when
+# any shared measurement is slower than the baseline by more than
+# --threshold. Test files are generated in --workdir (default: a temporary
+# directory) and removed afterwards; point it at real disk for multi-GB sizes.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import engine, jobs
+
+PASSWORD = "benchmark"
+UNITS = {"": 1, "K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+
+def parse_bytes(text):
+    text = text.strip().upper()
+    unit = text[-1] if text and text[-1] in UNITS else ""
+    return int(text[:len(text) - len(unit)]) * UNITS[unit]
+
+def size_list(text):
+    return [parse_bytes(t) for t in text.split(",") if t.strip()]
+
+def human(n):
+    for unit in ("G", "M", "K"):
+        if n >= UNITS[unit] and n % UNITS[unit] == 0:
+            return f"{n // UNITS[unit]}{unit}"
+    return str(n)
+
+def make_file(path, size, block=os.urandom(1 << 20)):
+    with open(path, "wb") as f:
+        left = size
+        while left:
+            n = min(left, len(block))
+            f.write(block[:n])
+            left -= n
+
+class Bench:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+    def measure(self, name, params, func, nbytes=0, count=0):
+        # func() runs one iteration and may return its own elapsed time
+        # (seconds) when setup has to be excluded.
+        runs = []
+        for _ in range(self.repeat):
+            start = time.perf_counter()
+            got = func()
+            runs.append(got if isinstance(got, float) else time.perf_counter() - start)
+        seconds = statistics.median(runs)
+        result = {"name": name, "params": params, "seconds": seconds, "min": min(runs), "runs": runs}
+        if nbytes:
+            result["mb_s"] = nbytes / seconds / 1e6
+        if count:
+            result["per_s"] = count / seconds
+        self.results.append(result)
+        extra = f"{result['mb_s']:10.1f} MB/s" if nbytes else f"{result['per_s']:10.1f} /s" if count else ""
+        label = " ".join(f"{k}={v}" for k, v in params.items())
+        print(f"{name:<22} {label:<42} {seconds * 1e3:10.2f} ms {extra}", file=sys.stderr)
+        return result
+
+def bench_kdf(b, args):
+    salt = os.urandom(engine.SALT_SIZE)
+    b.measure("kdf.pbkdf2", {"iterations": engine.KDF_ITERATIONS}, lambda: engine.derive_key(PASSWORD, salt))
+
+def bench_cipher(b, args):
+    total = max(args.cipher_bytes, max(args.buffers))
+    key, iv = os.urandom(engine.KEY_SIZE), os.urandom(engine.IV_SIZE)
+    for bs in args.buffers:
+        block = os.urandom(bs)
+        n = max(total // bs, 1)
+        def cbc():
+            c = engine._Cipher(True, key, iv)
+            try:
+                for _ in range(n):
+                    c.update(block)
+                c.final()
+            finally:
+                c.close()
+        b.measure("cipher.cbc", {"buffer": human(bs)}, cbc, nbytes=n * bs)
+        for mode, cipher in engine.MODES.items():
+            seal = engine.SEALERS[cipher]
+            def aead():
+                for i in range(n):
+                    seal(True, key, os.urandom(12), b"", block)
+            b.measure(f"cipher.{mode}", {"buffer": human(bs)}, aead, nbytes=n * bs)
+
+def run_bin(tool, *argv):
+    p = subprocess.run([jobs.get_bin(tool), *argv], input=PASSWORD + "\n",
+                       stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    if p.returncode != 0:
+        raise RuntimeError(f"{tool} failed: {p.stdout.strip()}")
+
+def bench_tools(b, args):
+    have_bins = all(os.path.exists(jobs.get_bin(t)) for t in ("encryptor", "decryptor"))
+    for size in args.sizes:
+        src = os.path.join(args.workdir, f"plain-{human(size)}")
+        enc = src + ".bin"
+        out = src + ".out"
+        make_file(src, size)
+        for bs in args.buffers:
+            params = {"size": human(size), "buffer": human(bs)}
+            if have_bins:
+                b.measure("tools.encryptor", params, lambda: run_bin("encryptor", "-b", str(bs), src, enc), nbytes=size)
+                b.measure("tools.decryptor", params, lambda: run_bin("decryptor", "-b", str(bs), enc, out), nbytes=size)
+            b.measure("engine.encrypt", params, lambda: engine.encrypt_file(src, enc, PASSWORD, buffer_size=bs), nbytes=size)
+            b.measure("engine.decrypt", params, lambda: engine.decrypt_file(enc, out, PASSWORD, buffer_size=bs), nbytes=size)
+        params = {"size": human(size)}
+        b.measure("engine.encrypt_gcm", params, lambda: engine.encrypt_file(src, enc, PASSWORD, mode="gcm"), nbytes=size)
+        b.measure("engine.decrypt_gcm", params, lambda: engine.decrypt_file(enc, out, PASSWORD), nbytes=size)
+        for path in (src, enc, out):
+            if os.path.exists(path):
+                os.remove(path)
+
+def bench_spawn(b, args):
+    exe = jobs.get_bin("encryptor")
+    if not os.path.exists(exe):
+        return
+    n = 20
+    def spawn():
+        for _ in range(n):
+            subprocess.run([exe], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    r = b.measure("spawn.encryptor", {"runs": n}, spawn, count=n)
+    r["per_spawn"] = r["seconds"] / n
+
+def bench_batch(b, args):
+    have_bins = os.path.exists(jobs.get_bin("encryptor"))
+    for count in args.counts:
+        src = os.path.join(args.workdir, f"batch-{count}")
+        os.makedirs(src)
+        for i in range(count):
+            make_file(os.path.join(src, f"f{i:05d}"), args.batch_file_size)
+        for in_process in ([True, False] if have_bins else [True]):
+            dst = os.path.join(args.workdir, "batch-out")
+            def run():
+                shutil.rmtree(dst, ignore_errors=True)
+                jobs_ = jobs.build_jobs(src, dst, lambda rel: rel + ".bin")
+                start = time.perf_counter()
+                jobs.Batch(jobs.get_bin("encryptor"), jobs_, PASSWORD, in_process=in_process).run()
+                return time.perf_counter() - start
+            params = {"files": count, "file_size": human(args.batch_file_size),
+                      "path": "engine" if in_process else "binary"}
+            b.measure("batch.encrypt", params, run, nbytes=count * args.batch_file_size, count=count)
+            shutil.rmtree(dst, ignore_errors=True)
+        shutil.rmtree(src)
+
+def bench_signals(b, args):
+    try:
+        from PyQt5.QtCore import QCoreApplication, QThread, pyqtSignal
+    except ImportError:
+        print("signals: PyQt5 not installed, skipped", file=sys.stderr)
+        return
+    import dashboard
+    app = QCoreApplication.instance() or QCoreApplication(sys.argv[:1])
+    n = 20000
+
+    class Emitter(QThread):
+        line = pyqtSignal(str)
+        def run(self):
+            for i in range(n):
+                self.line.emit("Encryption completed!\n")
+
+    def deliver():
+        got = [0]
+        t = Emitter()
+        t.line.connect(lambda s: got.__setitem__(0, got[0] + 1))
+        start = time.perf_counter()
+        t.start()
+        while got[0] < n:
+            app.processEvents()
+        t.wait()
+        return time.perf_counter() - start
+    b.measure("signals.queued_str", {"signals": n}, deliver, count=n)
+
+    src = os.path.join(args.workdir, "signal-src")
+    dst = src + ".bin"
+    make_file(src, 1024)
+    for in_process in ([True, False] if os.path.exists(jobs.get_bin("encryptor")) else [True]):
+        argv = jobs.tool_args("encryptor", src, dst, progress=True)
+        path = "engine" if in_process else "binary"
+        b.measure("job.run_tool", {"path": path}, lambda: jobs.run_tool(argv, PASSWORD, None, in_process))
+        def worker():
+            w = dashboard.Worker(argv, PASSWORD, in_process)
+            done = []
+            w.finished_signal.connect(done.append)
+            start = time.perf_counter()
+            w.start()
+            while not done:
+                app.processEvents()
+            w.wait()
+            return time.perf_counter() - start
+        b.measure("job.worker", {"path": path}, worker)
+    os.remove(src)
+    os.remove(dst)
+
+SUITES = {"kdf": bench_kdf, "cipher": bench_cipher, "tools": bench_tools, "spawn": bench_spawn,
+          "batch": bench_batch, "signals": bench_signals}
+
+def metadata():
+    def git(*argv):
+        try:
+            return subprocess.run(["git", *argv], cwd=ROOT, stdout=subprocess.PIPE,
+                                  stderr=subprocess.DEVNULL, universal_newlines=True).stdout.strip()
+        except OSError:
+            return ""
+    return {
+        "commit": git("rev-parse", "--short", "HEAD"),
+        "dirty": bool(git("status", "--porcelain", "--untracked-files=no")),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+    }
+
+def key(result):
+    return result["name"] + " " + json.dumps(result["params"], sort_keys=True)
+
+def compare(results, path, threshold):
+    with open(path) as f:
+        base = {key(r): r for r in json.load(f)["results"]}
+    worse = 0
+    print(f"\n{'benchmark':<64} {'base ms':>10} {'now ms':>10} {'change':>8}", file=sys.stderr)
+    for r in results:
+        old = base.get(key(r))
+        if not old:
+            continue
+        change = r["seconds"] / old["seconds"] - 1
+        flag = ""
+        if change > threshold:
+            worse += 1
+            flag = "  SLOWER"
+        print(f"{key(r)[:64]:<64} {old['seconds'] * 1e3:10.2f} {r['seconds'] * 1e3:10.2f} {change:+7.1%}{flag}",
+              file=sys.stderr)
+    return worse
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the crypto tools, the engine and the job path.")
+    ap.add_argument("-o", "--output", help="write JSON results here (default: stdout)")
+    ap.add_argument("--only", default=",".join(SUITES), help="comma-separated suites: " + ",".join(SUITES))
+    ap.add_argument("--sizes", type=size_list, default=size_list("1K,1M,64M"), help="file sizes for 'tools'")
+    ap.add_argument("--buffers", type=size_list, default=size_list("64K,1M,4M"), help="buffer sizes (-b)")
+    ap.add_argument("--counts", type=lambda s: [int(x) for x in s.split(",")], default=[10, 100],
+                    help="file counts for 'batch'")
+    ap.add_argument("--batch-file-size", type=parse_bytes, default=parse_bytes("64K"))
+    ap.add_argument("--cipher-bytes", type=parse_bytes, default=parse_bytes("64M"),
+                    help="bytes per 'cipher' measurement")
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--workdir", help="where test files are generated")
+    ap.add_argument("--compare", metavar="BASE.json", help="compare against an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown for --compare (default 0.10)")
+    args = ap.parse_args()
+    if not engine.available():
+        sys.exit("crypto_bench: libcrypto not found")
+    for suite in args.only.split(","):
+        if suite not in SUITES:
+            sys.exit(f"crypto_bench: unknown suite {suite!r}")
+    args.workdir = tempfile.mkdtemp(prefix="encryd-bench-", dir=args.workdir)
+    b = Bench(args.repeat)
+    try:
+        for suite in args.only.split(","):
+            SUITES[suite](b, args)
+    finally:
+        shutil.rmtree(args.workdir, ignore_errors=True)
+    report = {"meta": metadata(), "config": {
+        "sizes": [human(s) for s in args.sizes], "buffers": [human(s) for s in args.buffers],
+        "counts": args.counts, "repeat": args.repeat}, "results": b.results}
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.compare and compare(b.results, args.compare, args.threshold):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import os, sys, time, argparse, importlib.util
+
+# Idle rendering cost of the dashboard: paints per second for NeonFrame and
+# TerminalOutput, the pixel area they repaint, and process CPU%.
+#
+#   python benchmarks/render_bench.py                    # this tree
+#   python benchmarks/render_bench.py --low-power
+#   git show <rev>:dashboard.py > /tmp/old.py && python benchmarks/render_bench.py /tmp/old.py
+#   (before the CLI split the dashboard lived in encryd.py)
+#
+# Without a display it runs on Qt's offscreen platform, which still rasterises
+# every paint into the backing store.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def load(path):
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("encryd_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def count_paints(cls, stats):
+    orig = cls.paintEvent
+    def paintEvent(self, event):
+        stats[0] += 1
+        stats[1] += sum(r.width() * r.height() for r in event.region().rects())
+        orig(self, event)
+    cls.paintEvent = paintEvent
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("module", nargs="?", default=os.path.join(ROOT, "dashboard.py"))
+    ap.add_argument("--seconds", type=float, default=5.0)
+    ap.add_argument("--low-power", action="store_true")
+    ap.add_argument("--minimized", action="store_true")
+    args = ap.parse_args()
+    if args.low_power:
+        os.environ["ENCRYD_LOW_POWER"] = "1"
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    from PyQt5.QtWidgets import QApplication
+    app = QApplication(sys.argv[:1])
+    mod = load(args.module)
+    frames, terms = [0, 0], [0, 0]
+    count_paints(mod.NeonFrame, frames)
+    count_paints(mod.TerminalOutput, terms)
+    win = mod.DashboardWindow()
+    win.showMinimized() if args.minimized else win.show()
+    # let the first full paint settle before measuring
+    end = time.monotonic() + 0.5
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.001)
+    frames[:], terms[:] = [0, 0], [0, 0]
+    wall, cpu = time.monotonic(), time.process_time()
+    end = wall + args.seconds
+    while time.monotonic() < end:
+        app.processEvents()
+        time.sleep(0.001)
+    wall, cpu = time.monotonic() - wall, time.process_time() - cpu
+    print(f"module:          {args.module}")
+    print(f"NeonFrame:       {frames[0] / wall:8.1f} paints/s  {frames[1] / wall / 1e6:8.2f} Mpx/s")
+    print(f"TerminalOutput:  {terms[0] / wall:8.1f} paints/s  {terms[1] / wall / 1e6:8.2f} Mpx/s")
+    print(f"CPU:             {100 * cpu / wall:8.1f} %")
+
+if __name__ == "__main__":
+    main()
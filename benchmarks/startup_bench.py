@@ -0,0 +1,66 @@
+import os, sys, json, time, argparse, statistics, subprocess, importlib.util
+
+# Dashboard startup: time to import the module, build the window and get the
+# first paint, each measured in a fresh interpreter and reported as the
+# median of --runs.
+#
+#   python benchmarks/startup_bench.py                   # this tree
+#   git show <rev>:dashboard.py > /tmp/old.py && python benchmarks/startup_bench.py /tmp/old.py
+#
+# The dashboard itself prints the same first-paint time with
+# ENCRYD_STARTUP_TIME=1. Without a display it runs on Qt's offscreen platform.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def child(path):
+    t0 = time.monotonic()
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, QEvent
+    sys.path.insert(0, ROOT)
+    spec = importlib.util.spec_from_file_location("encryd_under_test", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    t_import = time.monotonic()
+    app = QApplication(sys.argv[:1])
+    win = mod.DashboardWindow()
+    t_build = time.monotonic()
+    times = {}
+    class FirstPaint(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and not times:
+                times["paint"] = time.monotonic()
+                app.quit()
+            return False
+    watcher = FirstPaint()
+    win.installEventFilter(watcher)
+    win.show()
+    app.exec_()
+    print(json.dumps({
+        "import_ms": (t_import - t0) * 1000,
+        "build_ms": (t_build - t_import) * 1000,
+        "first_paint_ms": (times["paint"] - t0) * 1000,
+    }))
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("module", nargs="?", default=os.path.join(ROOT, "dashboard.py"))
+    ap.add_argument("--runs", type=int, default=7)
+    ap.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+    if not os.environ.get("DISPLAY") and not os.environ.get("WAYLAND_DISPLAY"):
+        os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    if args.child:
+        child(args.module)
+        return
+    runs = []
+    for _ in range(args.runs):
+        out = subprocess.run([sys.executable, __file__, "--child", args.module],
+                             stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, universal_newlines=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(f"module:       {args.module}")
+    for key, label in (("import_ms", "import"), ("build_ms", "build window"), ("first_paint_ms", "first paint")):
+        values = [r[key] for r in runs]
+        print(f"{label + ':':<14}{statistics.median(values):8.1f} ms  (min {min(values):.1f}, {len(values)} runs)")
+
+if __name__ == "__main__":
+    main()
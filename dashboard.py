@@ -0,0 +1,918 @@
+import sys, os, re, shutil, subprocess, time, threading, logging, logging.handlers
+from collections import deque
+# Process start as far as this module can tell; time to first paint is
+# measured from here, so it includes importing Qt.
+STARTED = time.monotonic()
+from PyQt5.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
+    QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit, QCheckBox, QComboBox,
+    QProgressBar, QFrame, QSizeGrip, QMessageBox
+)
+from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint, QEvent, QObject
+from PyQt5.QtGui import (
+    QFont, QColor, QPainter, QBrush, QLinearGradient, QPen, QIcon, QPixmap, QRegion,
+    QTextCursor, QTextCharFormat
+)
+import engine
+from jobs import (
+    AsyncBatch, Batch, Manifest, ProgressFilter, ToolJob, CANCEL_GRACE, probe_report, get_bin, tool_args, encrypt_output, decrypt_output,
+    describe_exit, is_batch_input, build_jobs, stale_binaries, EXIT_CANCELLED
+)
+
+# Low-power mode: no border animation (ENCRYD_LOW_POWER=1 or the ◐ button).
+LOW_POWER = os.environ.get("ENCRYD_LOW_POWER") == "1"
+# After the first paint, stale C tools (see jobs.stale_binaries) are rebuilt
+# with make's release profile; ENCRYD_NO_AUTOBUILD=1 turns that off.
+AUTOBUILD = os.environ.get("ENCRYD_NO_AUTOBUILD") != "1"
+# Terminal panes keep the last LOG_MAX_LINES lines and are refreshed every
+# LOG_INTERVAL_MS; ENCRYD_LOG_FILE also spills everything to a rotating file.
+LOG_MAX_LINES = 5000
+LOG_INTERVAL_MS = 50
+LOG_FILE = os.environ.get("ENCRYD_LOG_FILE")
+
+# Stylesheets are set once on a container and matched by type or objectName
+# rather than per widget, so Qt parses each of them once per panel (or once
+# per window) instead of once per field. "X, X *" mirrors what a selector-less
+# sheet set on X itself did.
+PANEL_STYLE = """
+QLabel#head { color: #fff; letter-spacing:3px; margin-bottom:12px; }
+QLineEdit, QLineEdit *, QComboBox, QComboBox * {
+    background: #23242A;
+    color: #FFF;
+    border-radius: 7px;
+    border: 2px solid #2DFFAE;
+    padding-left: 10px;
+}
+QPushButton#pick { background:#101215;color:#0FF; border-radius:7px; }
+QCheckBox { color: #0FF; }
+QProgressBar {
+    background: #101215;
+    border: 2px solid #0FF;
+    border-radius: 8px;
+    text-align: center;
+    color: #0FF;
+    font-size: 15px;
+}
+QProgressBar::chunk {
+    background: qlineargradient(
+        x1:0, y1:0, x2:1, y2:0,
+        stop:0 #1FF7E0, stop:1 #2DFFAE
+    );
+    border-radius: 8px;
+}
+QPushButton#run {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0FF, stop:1 #1FF7E0);
+    color: #181C20;
+    border-radius: 14px;
+    border: 2px solid #0FF;
+    padding: 12px 30px;
+    font-size: 17px;
+}
+QPushButton#run:hover {
+    background: #1FF7E0;
+    color: #fff;
+    border: 2px solid #2DFFAE;
+}
+"""
+SIDEBAR_STYLE = """
+QPushButton {
+    background: #101215;
+    color: #0FF;
+    border: 2px solid #222;
+    border-radius: 10px;
+    padding: 12px 10px;
+    text-align: left;
+}
+QPushButton:hover, QPushButton:checked {
+    background: #181C20;
+    color: #F0F;
+    border: 2px solid #0FF;
+}
+"""
+WINDOW_STYLE = """
+QPushButton#power, QPushButton#min, QPushButton#max, QPushButton#close {
+    background:#101215; color:#0FF; border-radius:9px; font-size:18px;
+}
+QPushButton#power:checked { color:#F0F; }
+QPushButton#min { font-size:20px; }
+QPushButton#close { color:#F77; font-size:16px; }
+QLabel#title { padding: 22px; letter-spacing:3px; }
+QPushButton#tool {
+    background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0FF, stop:1 #1FF7E0);
+    color: #181C20;
+    border-radius: 10px;
+    border: 2px solid #0FF;
+    padding: 8px 16px;
+    font-size: 17px;
+}
+QPushButton#tool:hover {
+    background: #1FF7E0;
+    color: #000;
+    border: 2px solid #2DFFAE;
+}
+"""
+
+class Worker(QThread):
+    output_signal = pyqtSignal(str)
+    progress_signal = pyqtSignal('qint64', 'qint64')
+    finished_signal = pyqtSignal(int)
+    def __init__(self, args, password=None, in_process=False, options=None):
+        super().__init__()
+        # progress records become progress_signal, capped at one per
+        # PROGRESS_INTERVAL (plus the final one) so the UI thread keeps up
+        on_line = ProgressFilter(self.output_signal.emit, self.progress_signal.emit)
+        self.job = ToolJob(args, password, on_line, in_process, options)
+    def run(self):
+        self.finished_signal.emit(self.job.run())
+    def cancel(self):
+        self.job.cancel()
+
+class BatchWorker(QThread):
+    output_signal = pyqtSignal(str)
+    job_signal = pyqtSignal(int, str)
+    finished_signal = pyqtSignal(int)
+    def __init__(self, tool, jobs, password, workers=None, retries=1, in_process=False, options=None, flags=None,
+                 manifest=None):
+        super().__init__()
+        # binaries run on one event loop; engine jobs need the thread pool
+        self.batch = (Batch if in_process else AsyncBatch)(
+            tool, jobs, password, workers, retries, in_process, options, flags,
+            on_output=self.output_signal.emit, on_job=self.job_signal.emit, manifest=manifest,
+        )
+        self.jobs = jobs
+    def run(self):
+        self.finished_signal.emit(self.batch.run())
+    def cancel(self):
+        self.batch.cancel()
+
+class MakeWorker(QThread):
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(int)
+    def run(self):
+        try:
+            p = subprocess.Popen(
+                ["make"],
+                cwd=os.path.dirname(__file__),
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                bufsize=1, universal_newlines=True,
+            )
+            for line in p.stdout:
+                self.output_signal.emit(line)
+            code = p.wait()
+            self.finished_signal.emit(code)
+        except Exception as e:
+            self.output_signal.emit(f"Make Error: {e}\n")
+            self.finished_signal.emit(-1)
+
+class ProbeWorker(QThread):
+    output_signal = pyqtSignal(str)
+    finished_signal = pyqtSignal(int)
+    def run(self):
+        try:
+            for line in probe_report():
+                self.output_signal.emit(line)
+            self.finished_signal.emit(0)
+        except Exception as e:
+            self.output_signal.emit(f"Probe Error: {e}\n")
+            self.finished_signal.emit(-1)
+
+class NeonFrame(QFrame):
+    # Qt's DotLine repeats every 3 pen widths and the dash offset moves in
+    # whole pen widths, so the animation only ever shows 3 distinct frames.
+    # They are rendered once per size into pixmaps; each tick blits one and
+    # repaints just the ring around the dashes. The timer runs only while
+    # the frame is visible, its window is not minimized and low-power mode
+    # is off.
+    DASH_PERIOD = 3
+    STYLE = "* { background: rgba(24, 28, 32, 0.82); border-radius: 22px; }"
+    def __init__(self, parent=None, color1="#00fff7", color2="#2dffae"):
+        super().__init__(parent)
+        self.setStyleSheet(self.STYLE)
+        self.color1 = QColor(color1)
+        self.color2 = QColor(color2)
+        self._anim_val = 0
+        self._cache = {}
+        self._timer = QTimer(self)
+        self._timer.setInterval(30)
+        self._timer.timeout.connect(self.animate)
+    def sync_timer(self):
+        if self.isVisible() and not LOW_POWER and not self.window().isMinimized():
+            self._timer.start()
+        else:
+            self._timer.stop()
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.sync_timer()
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self._timer.stop()
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._cache.clear()
+    def animate(self):
+        self._anim_val = (self._anim_val + 4) % 360
+        r = self.rect().adjusted(11,11,-11,-11)
+        self.update(QRegion(r.adjusted(-8,-8,8,8)) - QRegion(r.adjusted(8,8,-8,-8)))
+    def _render(self, dash_offset):
+        dpr = self.devicePixelRatioF()
+        pm = QPixmap(self.size() * dpr)
+        pm.setDevicePixelRatio(dpr)
+        pm.fill(Qt.transparent)
+        qp = QPainter(pm)
+        qp.setRenderHint(QPainter.Antialiasing)
+        r = self.rect().adjusted(5,5,-5,-5)
+        # Hi-tech glowing border: double neon gradient, animated
+        grad_outer = QLinearGradient(r.topLeft(), r.bottomRight())
+        grad_outer.setColorAt(0, self.color1.lighter(160))
+        grad_outer.setColorAt(0.5, self.color2.lighter(180))
+        grad_outer.setColorAt(1, self.color1.lighter(160))
+        pen_outer = QPen(QBrush(grad_outer), 5)
+        pen_outer.setCapStyle(Qt.RoundCap)
+        pen_outer.setJoinStyle(Qt.RoundJoin)
+        qp.setPen(pen_outer)
+        qp.drawRoundedRect(r, 22, 22)
+        # Animated dashed inner border
+        grad_inner = QLinearGradient(r.topRight(), r.bottomLeft())
+        grad_inner.setColorAt(0, self.color2.lighter(230))
+        grad_inner.setColorAt(1, self.color1.lighter(230))
+        pen_inner = QPen(QBrush(grad_inner), 2)
+        pen_inner.setStyle(Qt.DotLine)
+        pen_inner.setDashOffset(dash_offset)
+        qp.setPen(pen_inner)
+        r_inner = r.adjusted(6,6,-6,-6)
+        qp.drawRoundedRect(r_inner, 15, 15)
+        # Optional: draw "corner widgets" for more hitec look
+        for corner in [r_inner.topLeft(), r_inner.topRight(), r_inner.bottomLeft(), r_inner.bottomRight()]:
+            qp.setBrush(QBrush(self.color1.lighter(180)))
+            qp.setPen(Qt.NoPen)
+            qp.drawEllipse(corner, 7, 7)
+        qp.end()
+        return pm
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        phase = self._anim_val % self.DASH_PERIOD
+        if phase not in self._cache:
+            self._cache[phase] = self._render(phase)
+        qp = QPainter(self)
+        qp.drawPixmap(0, 0, self._cache[phase])
+
+class TerminalOutput(QTextEdit):
+    # The scanlines are static, so they are a tiled brush painted with the
+    # normal repaints instead of a 30 ms timer forcing full redraws.
+    _scanlines = None
+    def __init__(self):
+        super().__init__()
+        self.setReadOnly(True)
+        self.setFont(QFont("Fira Mono", 13))
+        self.setStyleSheet("""
+            background: #101215;
+            color: #00fff7;
+            border-radius: 12px;
+            padding: 10px;
+            selection-background-color: #38006e;
+        """)
+        self.setCursorWidth(2)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if TerminalOutput._scanlines is None:
+            tile = QPixmap(1, 4)
+            tile.fill(Qt.transparent)
+            tp = QPainter(tile)
+            tp.fillRect(0, 0, 1, 2, QColor("#00fff7"))
+            tp.end()
+            TerminalOutput._scanlines = QBrush(tile)
+        qp = QPainter(self.viewport())
+        qp.setOpacity(0.14)
+        qp.fillRect(event.rect(), TerminalOutput._scanlines)
+    def scrollContentsBy(self, dx, dy):
+        # scrolling blits the old pixels, scanlines included; redraw so they
+        # stay fixed to the viewport
+        super().scrollContentsBy(dx, dy)
+        self.viewport().update()
+
+class LogSink(QObject):
+    # Thread-safe, coalescing writer for a TerminalOutput. Workers call
+    # write() straight from their own thread (connect with
+    # Qt.DirectConnection) so there is no queued event per line; lines are
+    # held in a bounded deque and flushed every LOG_INTERVAL_MS as one plain
+    # text insert. The document itself is capped at max_lines blocks.
+    _wake = pyqtSignal()
+    def __init__(self, term, max_lines=LOG_MAX_LINES, interval=LOG_INTERVAL_MS, spill_path=LOG_FILE):
+        super().__init__(term)
+        self.term = term
+        self.term.document().setMaximumBlockCount(max_lines)
+        self.interval = interval
+        self._pending = deque(maxlen=max_lines)
+        self._dropped = 0
+        self._scheduled = False
+        self._lock = threading.Lock()
+        self._wake.connect(self._arm)
+        self._spill = None
+        if spill_path:
+            self._spill = logging.getLogger(f"encryd.log.{id(self)}")
+            self._spill.propagate = False
+            self._spill.setLevel(logging.INFO)
+            handler = logging.handlers.RotatingFileHandler(spill_path, maxBytes=10 << 20, backupCount=3)
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._spill.addHandler(handler)
+    def write(self, text, rich=False):
+        text = text.rstrip("\n")
+        if self._spill:
+            self._spill.info(re.sub(r"<[^>]+>", "", text) if rich else text)
+        with self._lock:
+            if len(self._pending) == self._pending.maxlen:
+                self._dropped += 1
+            self._pending.append((text, rich))
+            wake = not self._scheduled
+            self._scheduled = True
+        if wake:
+            self._wake.emit()
+    def _arm(self):
+        QTimer.singleShot(self.interval, self.flush)
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._dropped = 0
+        self.term.clear()
+    def flush(self):
+        with self._lock:
+            items, self._pending = list(self._pending), deque(maxlen=self._pending.maxlen)
+            dropped, self._dropped = self._dropped, 0
+            self._scheduled = False
+        if not items:
+            return
+        bar = self.term.verticalScrollBar()
+        at_bottom = bar.value() >= bar.maximum() - 4
+        if dropped:
+            items.insert(0, (f"... {dropped} lines dropped ...", False))
+        cursor = QTextCursor(self.term.document())
+        plain = []
+        for text, rich in items + [(None, True)]:
+            if not rich:
+                plain.append(text)
+                continue
+            if plain:
+                # plain-text fast path: one insert for the whole run
+                cursor.movePosition(QTextCursor.End)
+                cursor.setCharFormat(QTextCharFormat())
+                if not self.term.document().isEmpty():
+                    cursor.insertBlock()
+                cursor.insertText("\n".join(plain))
+                plain = []
+            if text is not None:
+                self.term.append(text)
+        if at_bottom:
+            bar.setValue(bar.maximum())
+
+class Sidebar(QWidget):
+    tabChanged = pyqtSignal(int)
+    def __init__(self, tabs):
+        super().__init__()
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(4,4,4,4)
+        self.layout.setSpacing(12)
+        self.buttons = []
+        self.setStyleSheet(SIDEBAR_STYLE)
+        for idx, (name, icon) in enumerate(tabs):
+            btn = QPushButton(icon + "  " + name)
+            btn.setFont(QFont("Fira Mono", 13, QFont.Bold))
+            btn.setCheckable(True)
+            btn.clicked.connect(lambda checked, i=idx: self.change_tab(i))
+            self.layout.addWidget(btn)
+            self.buttons.append(btn)
+        self.layout.addStretch()
+        self.setFixedWidth(180)
+        self.change_tab(0)
+    def change_tab(self, idx):
+        for i, btn in enumerate(self.buttons):
+            btn.setChecked(i==idx)
+        self.tabChanged.emit(idx)
+
+class BasePanel(QWidget):
+    finished_signal = pyqtSignal(int)
+    def __init__(self, title, icon, operation_fields, run_callback):
+        super().__init__()
+        neon = NeonFrame()
+        neon.setStyleSheet(NeonFrame.STYLE + PANEL_STYLE)
+        vbox = QVBoxLayout(neon)
+        vbox.setContentsMargins(24,24,24,24)
+        head = QLabel(f"{icon}  <span style='font-size:22px;'>{title}</span>")
+        head.setObjectName("head")
+        head.setTextFormat(Qt.RichText)
+        head.setFont(QFont("Fira Mono", 18, QFont.Bold))
+        vbox.addWidget(head)
+        form = QFormLayout()
+        self.fields = {}
+        for label, field_type, *rest in operation_fields:
+            field = None
+            if field_type in ("file", "savefile"):
+                field = self._line_edit()
+                field.setPlaceholderText("Choose file..." if field_type == "file" else "Choose save location...")
+                btn = QPushButton("FILE" if field_type == "file" else "SAVE")
+                btn.setObjectName("pick")
+                btn.setMaximumWidth(40)
+                btn.setMinimumHeight(35)
+                mode = (rest[0] if rest else "open") if field_type == "file" else "save"
+                btn.clicked.connect(lambda _, f=field, m=mode: self._pick_file(f, m))
+                h = QHBoxLayout(); h.setContentsMargins(0,0,0,0)
+                h.addWidget(field); h.addWidget(btn)
+                w = QWidget(); w.setLayout(h)
+                form.addRow(label, w)
+            elif field_type == "password":
+                field = self._line_edit()
+                field.setEchoMode(QLineEdit.Password)
+                cb = QCheckBox("👁 Show")
+                cb.setMinimumHeight(35)
+                cb.stateChanged.connect(lambda x, f=field: f.setEchoMode(QLineEdit.Normal if x else QLineEdit.Password))
+                h = QHBoxLayout(); h.setContentsMargins(0,0,0,0)
+                h.addWidget(field); h.addWidget(cb)
+                w = QWidget(); w.setLayout(h)
+                form.addRow(label, w)
+            elif field_type == "choice":
+                field = QComboBox()
+                field.addItems(rest[0])
+                field.setMinimumHeight(35)
+                field.setFont(QFont("Fira Mono", 12))
+                form.addRow(label, field)
+            elif field_type == "check":
+                field = QCheckBox()
+                field.setMinimumHeight(35)
+                field.setChecked(bool(rest[0]) if rest else False)
+                form.addRow(label, field)
+            else:
+                field = self._line_edit()
+                if rest:
+                    field.setText(rest[0])
+                form.addRow(label, field)
+            self.fields[label] = field
+        vbox.addLayout(form)
+        self.outterm = TerminalOutput()
+        self.sink = LogSink(self.outterm)
+        vbox.addWidget(self.outterm, 1)
+        self.progress = QProgressBar()
+        self.progress.setMaximum(0)
+        self.progress.setMinimum(0)
+        self.progress.setVisible(False)
+        vbox.addWidget(self.progress)
+        self.run_btn = QPushButton("▶ Run")
+        self.run_btn.setObjectName("run")
+        self.run_btn.setFont(QFont("Fira Mono", 17, QFont.Bold))
+        self.run_btn.setMinimumHeight(45)
+        self.run_btn.clicked.connect(lambda: run_callback(self))
+        self.actions = QHBoxLayout()
+        self.actions.addWidget(self.run_btn, 1)
+        vbox.addLayout(self.actions)
+        self.worker = None
+        self.cancel_btn = self.add_action("■ Cancel", self.cancel)
+        self.cancel_btn.setVisible(False)
+        self.setLayout(QVBoxLayout())
+        self.layout().addWidget(neon)
+
+    def _line_edit(self):
+        field = QLineEdit()
+        field.setMinimumHeight(35)
+        field.setFont(QFont("Fira Mono", 12))
+        return field
+    def _pick_file(self, field, mode):
+        dlg = QFileDialog(self)
+        dlg.setStyleSheet("""
+            * { color: #fff; background: #23242A; }
+            QLineEdit, QLabel, QTreeView, QListView, QHeaderView { color: #fff; background: #000000; }
+            QPushButton { color: #fff; background: #101215; border-radius:6px;}
+            QDialogButtonBox QPushButton { color: #fff; }
+        """)
+        if mode=="open":
+            dlg.setFileMode(QFileDialog.ExistingFile)
+            if dlg.exec_():
+                files = dlg.selectedFiles()
+                if files:
+                    field.setText(files[0])
+        else:
+            dlg.setAcceptMode(QFileDialog.AcceptSave)
+            if dlg.exec_():
+                files = dlg.selectedFiles()
+                if files:
+                    field.setText(files[0])
+
+    def add_action(self, text, callback):
+        # Secondary button beside Run, styled like it
+        btn = QPushButton(text)
+        btn.setObjectName("run")
+        btn.setFont(self.run_btn.font())
+        btn.setMinimumHeight(45)
+        btn.clicked.connect(callback)
+        self.actions.addWidget(btn)
+        return btn
+    def log(self, msg):
+        self.sink.write(msg, rich=True)
+    def _set_running(self, running):
+        # one job per panel: the other actions wait until it has finished
+        for i in range(self.actions.count()):
+            self.actions.itemAt(i).widget().setEnabled(not running)
+        self.cancel_btn.setEnabled(running)
+        self.cancel_btn.setVisible(running)
+    def cancel(self):
+        if self.worker and self.worker.isRunning():
+            self.cancel_btn.setEnabled(False)
+            self.log("<span style='color:#FC5;'>Cancelling...</span>")
+            self.worker.cancel()
+    def stop(self):
+        # Cancels a running job and waits for its thread, e.g. on close
+        if self.worker and self.worker.isRunning():
+            self.worker.cancel()
+            self.worker.wait(int((CANCEL_GRACE + 1) * 1000))
+    def run_worker(self, args, password=None, in_process=False, options=None):
+        self.sink.clear()
+        self._set_running(True)
+        self.progress.setVisible(True)
+        self.worker = Worker(args, password, in_process, options)
+        self._started = None  # (time, done) at the first progress record
+        self.worker.output_signal.connect(self.sink.write, Qt.DirectConnection)
+        self.worker.progress_signal.connect(self.on_progress)
+        self.worker.finished_signal.connect(self.on_finished)
+        self.worker.start()
+    def run_batch(self, tool, jobs, password, in_process=False, options=None, flags=None, manifest=None):
+        self.sink.clear()
+        self._set_running(True)
+        self.progress.setMaximum(len(jobs))
+        self.progress.setValue(0)
+        self.progress.setVisible(True)
+        self.worker = BatchWorker(tool, jobs, password, in_process=in_process, options=options, flags=flags,
+                                  manifest=manifest)
+        self.worker.output_signal.connect(self.sink.write, Qt.DirectConnection)
+        self.worker.job_signal.connect(self.log_job, Qt.DirectConnection)
+        self.worker.job_signal.connect(self.on_job)
+        self.worker.finished_signal.connect(self.on_finished)
+        self.worker.start()
+    def on_progress(self, done, total):
+        if total <= 0:
+            return
+        # measured from the first record, so a resumed run that starts at its
+        # checkpoint doesn't count the bytes done before it
+        now = time.monotonic()
+        if self._started is None:
+            self._started = (now, done)
+        start, base = self._started
+        rate = (done - base) / max(now - start, 1e-9)
+        self.progress.setMaximum(1000)
+        self.progress.setValue(int(done * 1000 / total))
+        if rate > 0:
+            eta = int((total - done) / rate)
+            self.progress.setFormat(f"%p%   {rate / 1e6:.1f} MB/s   ETA {eta // 60}:{eta % 60:02d}")
+    def log_job(self, idx, status):
+        # runs on the pool thread; the sink batches these
+        if status not in ("running", "skipped", "cancelled"):
+            self.sink.write(f"[{status}] {self.worker.jobs[idx].src}")
+    def on_job(self, idx, status):
+        if status in ("ok", "failed", "skipped", "cancelled"):
+            self.progress.setValue(self.progress.value() + 1)
+    def on_finished(self, code):
+        self._set_running(False)
+        self.progress.setVisible(False)
+        self.progress.setMaximum(0)
+        self.progress.setFormat("%p%")
+        color = "#0f0" if code == 0 else "#FC5" if code == EXIT_CANCELLED else "#F77"
+        self.log(f"<span style='color:{color};'>\n{describe_exit(code)}</span>")
+        self.finished_signal.emit(code)
+
+class DashboardWindow(QWidget):
+    # seconds from STARTED to the window's first paint
+    first_paint = pyqtSignal(float)
+    def __init__(self):
+        super().__init__()
+        self._painted = False
+        self.make_worker = None
+        if AUTOBUILD:
+            self.first_paint.connect(lambda _: QTimer.singleShot(0, self.check_build))
+        self.setWindowTitle("ENCRYD_v1")
+        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
+        self.setAttribute(Qt.WA_TranslucentBackground)
+        self.resize(1250, 930)
+        self.setMinimumSize(700, 400)
+        self.setStyleSheet(WINDOW_STYLE)
+        neon = NeonFrame()
+        neon.setStyleSheet("background: rgba(24,28,32,0.82); border-radius: 24px;")
+        layout = QHBoxLayout(neon)
+        layout.setContentsMargins(0,0,0,0)
+        sidebar = Sidebar([
+            ("Encrypt", "🔒"),
+            ("Decrypt", "🔓"),
+        ])
+        layout.addWidget(sidebar)
+        # Panels are built on first use; the hidden Decrypt panel costs
+        # nothing until its tab is opened.
+        self.panels = [None, None]
+        self.stack = QWidget()
+        self.stack_layout = QVBoxLayout(self.stack)
+        self.stack_layout.setContentsMargins(0,0,0,0)
+        self.stack_layout.setSpacing(0)
+        self.set_tab(0)
+        layout.addWidget(self.stack, 1)
+        neon_layout = QVBoxLayout(self)
+        neon_layout.setContentsMargins(20, 20, 20, 20)
+        neon_layout.addWidget(neon)
+        # Top bar with title and window controls
+        toph = QHBoxLayout()
+        self.dashboard = QLabel("""
+<span style='color:#0FF;font-size:38px;font-weight:bold;'>ENCRYD_v1</span><br>
+<span style='color:#2DFFAE;font-size:19px;'>  Made By WebDragon63</span>
+""")
+        self.dashboard.setAlignment(Qt.AlignCenter)
+        self.dashboard.setObjectName("title")
+        toph.addWidget(self.dashboard, 1)
+        # Window control buttons (minimize, maximize/restore, close)
+        btnbar = QHBoxLayout()
+        btnbar.setSpacing(8)
+        self.btn_power = QPushButton("◐")
+        self.btn_power.setFixedSize(32, 32)
+        self.btn_power.setCheckable(True)
+        self.btn_power.setChecked(LOW_POWER)
+        self.btn_power.setToolTip("Low-power mode (no animation)")
+        self.btn_power.setObjectName("power")
+        self.btn_power.clicked.connect(self.set_low_power)
+        self.btn_min = QPushButton("—")
+        self.btn_min.setFixedSize(32, 32)
+        self.btn_min.setObjectName("min")
+        self.btn_min.clicked.connect(self.showMinimized)
+        self.btn_max = QPushButton("▢")
+        self.btn_max.setFixedSize(32, 32)
+        self.btn_max.setObjectName("max")
+        self.btn_max.clicked.connect(self.toggle_fullscreen)
+        self.btn_close = QPushButton("✕")
+        self.btn_close.setFixedSize(32, 32)
+        self.btn_close.setObjectName("close")
+        self.btn_close.clicked.connect(self.close)
+        btnbar.addWidget(self.btn_power)
+        btnbar.addWidget(self.btn_min)
+        btnbar.addWidget(self.btn_max)
+        btnbar.addWidget(self.btn_close)
+        toph.addLayout(btnbar)
+        neon_layout.insertLayout(0, toph)
+        sidebar.tabChanged.connect(self.set_tab)
+        self.sizegrip = QSizeGrip(self)
+        neon_layout.addWidget(self.sizegrip, 0, Qt.AlignBottom | Qt.AlignRight)
+        # Build/Make button
+        self.make_btn = QPushButton("🛠 Build C Binaries")
+        self.make_btn.setFont(QFont("Fira Mono", 13, QFont.Bold))
+        self.make_btn.setMinimumHeight(45)
+        self.make_btn.setObjectName("tool")
+        self.make_btn.clicked.connect(lambda: self.run_make())
+        self.probe_btn = QPushButton("🧪 Probe Crypto")
+        self.probe_btn.setFont(QFont("Fira Mono", 13, QFont.Bold))
+        self.probe_btn.setMinimumHeight(45)
+        self.probe_btn.setObjectName("tool")
+        self.probe_btn.setToolTip("CPU crypto features and measured throughput per cipher mode")
+        self.probe_btn.clicked.connect(self.run_probe)
+        tools = QHBoxLayout()
+        tools.addWidget(self.make_btn, 1)
+        tools.addWidget(self.probe_btn)
+        neon_layout.addLayout(tools)
+        # Panel to show make output
+        self.make_term = TerminalOutput()
+        self.make_term.setFixedHeight(120)
+        self.make_sink = LogSink(self.make_term)
+        neon_layout.addWidget(self.make_term, 0, Qt.AlignTop)
+        self._drag_active = False
+        self._drag_pos = None
+
+    def make_panel(self, tab):
+        if tab==0: # Encrypt
+            panel = BasePanel("Encrypt", "🔒", [
+                ("Input file", "file"),
+                ("Output file", "savefile"),
+                ("Password", "password"),
+                ("In-process engine", "check", engine.available()),
+                ("Session key", "check"),
+                ("Cipher mode", "choice", ["cbc", "gcm", "ctr", "chacha20", "auto"]),
+                ("Compress before encrypting", "check"),
+                ("Pack folder into one file", "check"),
+                ("Incremental (skip unchanged)", "check"),
+                ("Resumable (checkpoint)", "check"),
+                ("Block size", "text", "1M"),
+            ], self.run_encrypt)
+            panel.resume_btn = panel.add_action("⟳ Resume", lambda: self.run_encrypt(panel, resume=True))
+            panel.resume_btn.setVisible(False)
+            for name in ("Input file", "Output file"):
+                panel.fields[name].textChanged.connect(lambda _: self.update_resume(panel))
+            panel.finished_signal.connect(lambda code: self.update_resume(panel))
+            return panel
+        elif tab==1: # Decrypt
+            panel = BasePanel("Decrypt", "🔓", [
+                ("Encrypted file", "file"),
+                ("Output file", "savefile"),
+                ("Password", "password"),
+                ("In-process engine", "check", engine.available()),
+                ("Block size", "text", "1M"),
+            ], self.run_decrypt)
+            panel.add_action("✔ Verify", lambda: self.run_verify(panel))
+            return panel
+    def set_tab(self, idx):
+        if self.panels[idx] is None:
+            self.panels[idx] = self.make_panel(idx)
+            self.stack_layout.addWidget(self.panels[idx])
+        for i, p in enumerate(self.panels):
+            if p is not None:
+                p.setVisible(i==idx)
+
+    def block_flags(self, panel):
+        size = panel.fields["Block size"].text().strip()
+        if not size:
+            return []
+        try:
+            engine.parse_size(size)
+        except ValueError as e:
+            panel.log(f"<span style='color:#F77;'>{e}</span>")
+            return None
+        return ["-b", size]
+    def update_resume(self, panel):
+        # Offer Resume when the chosen output has a checkpoint for this input
+        infile = panel.fields["Input file"].text()
+        outfile = panel.fields["Output file"].text()
+        offset = None
+        if infile and outfile and os.path.isfile(infile):
+            offset = engine.resume_offset(infile, encrypt_output(outfile))
+        panel.resume_btn.setText(f"⟳ Resume ({offset / 1e6:.0f} MB done)" if offset else "⟳ Resume")
+        panel.resume_btn.setVisible(bool(offset))
+    def run_encrypt(self, panel, resume=False):
+        infile = panel.fields["Input file"].text()
+        outfile = panel.fields["Output file"].text()
+        password = panel.fields["Password"].text()
+        in_process = panel.fields["In-process engine"].isChecked()
+        options = {}
+        if panel.fields["Session key"].isChecked():
+            options["session"] = True
+        mode = panel.fields["Cipher mode"].currentText()
+        if mode != "cbc":
+            options["mode"] = mode
+        if panel.fields["Compress before encrypting"].isChecked():
+            options["compress"] = "auto"
+        if resume or panel.fields["Resumable (checkpoint)"].isChecked():
+            options["resume"] = True
+        if not (infile and outfile and password):
+            panel.log("<span style='color:#F77;'>Please provide all fields.</span>")
+            return
+        if options and not in_process:
+            panel.log("<span style='color:#F77;'>Session key, cipher modes, compression and resume need the "
+                      "in-process engine.</span>")
+            return
+        if options.get("resume") and options.get("compress"):
+            panel.log("<span style='color:#F77;'>Resumable encryption can't be combined with compression.</span>")
+            return
+        flags = self.block_flags(panel)
+        if flags is None:
+            return
+        if panel.fields["Pack folder into one file"].isChecked():
+            if not os.path.isdir(infile):
+                panel.log("<span style='color:#F77;'>Packing needs a folder as input.</span>")
+                return
+            if not in_process:
+                panel.log("<span style='color:#F77;'>Packing needs the in-process engine.</span>")
+                return
+            options.pop("mode", None)  # containers are always GCM
+            options.pop("compress", None)  # and always compressed
+            options.pop("resume", None)
+            outfile = encrypt_output(outfile)
+            panel.fields["Output file"].setText(outfile)
+            panel.run_worker(tool_args("packer", infile, outfile, flags, progress=True), password, True, options)
+            return
+        # Folder or glob input: output field is the destination directory
+        if is_batch_input(infile):
+            jobs = build_jobs(infile, outfile, lambda rel: rel + '.bin')
+            manifest = Manifest(outfile) if panel.fields["Incremental (skip unchanged)"].isChecked() else None
+            panel.run_batch(get_bin("encryptor"), jobs, password, in_process, options, flags, manifest)
+            return
+        if outfile != encrypt_output(outfile):
+            outfile = encrypt_output(outfile)
+            panel.fields["Output file"].setText(outfile)
+        args = tool_args("encryptor", infile, outfile, flags, progress=True)
+        panel.run_worker(args, password=password, in_process=in_process, options=options)
+    def run_decrypt(self, panel):
+        infile = panel.fields["Encrypted file"].text()
+        outfile = panel.fields["Output file"].text()
+        password = panel.fields["Password"].text()
+        in_process = panel.fields["In-process engine"].isChecked()
+        if not (infile and outfile and password):
+            panel.log("<span style='color:#F77;'>Please provide all fields.</span>")
+            return
+        flags = self.block_flags(panel)
+        if flags is None:
+            return
+        # Pack container: output field is the destination directory
+        if engine.is_pack(infile):
+            if not in_process:
+                panel.log("<span style='color:#F77;'>Containers need the in-process engine.</span>")
+                return
+            panel.run_worker(tool_args("unpacker", infile, outfile, flags, progress=True), password, True)
+            return
+        if is_batch_input(infile):
+            jobs = build_jobs(infile, outfile, decrypt_output)
+            panel.run_batch(get_bin("decryptor"), jobs, password, in_process, flags=flags)
+            return
+        args = tool_args("decryptor", infile, outfile, flags, progress=True)
+        panel.run_worker(args, password=password, in_process=in_process)
+    def run_verify(self, panel):
+        # Authenticates the whole file under the password; nothing is written
+        infile = panel.fields["Encrypted file"].text()
+        password = panel.fields["Password"].text()
+        if not (infile and password):
+            panel.log("<span style='color:#F77;'>Please provide the encrypted file and password.</span>")
+            return
+        if not os.path.isfile(infile):
+            panel.log("<span style='color:#F77;'>Verify checks one encrypted file.</span>")
+            return
+        if not engine.available():
+            panel.log("<span style='color:#F77;'>Verifying needs the in-process engine.</span>")
+            return
+        flags = self.block_flags(panel)
+        if flags is None:
+            return
+        args = [get_bin("verifier"), "-g", *flags, infile]
+        panel.run_worker(args, password, True, {"full": True})
+    def run_make(self, note=None):
+        self.make_sink.clear()
+        if note:
+            self.make_sink.write(note)
+        self.make_btn.setEnabled(False)
+        self.make_worker = MakeWorker()
+        self.make_worker.output_signal.connect(self.make_sink.write, Qt.DirectConnection)
+        self.make_worker.finished_signal.connect(self.make_done)
+        self.make_worker.start()
+    def check_build(self):
+        # Runs after the first paint, so the stat calls never delay startup
+        stale = stale_binaries()
+        if not stale or (self.make_worker and self.make_worker.isRunning()):
+            return
+        if not shutil.which("make"):
+            self.make_sink.write(f"C tools out of date ({', '.join(stale)}); install make and gcc to rebuild them.")
+            return
+        self.run_make(f"C tools out of date ({', '.join(stale)}); rebuilding...")
+    def make_done(self, code):
+        self.make_btn.setEnabled(True)
+        if code == 0:
+            self.make_sink.write("<span style='color:#0f0;'>[Build Success]</span>", rich=True)
+        else:
+            self.make_sink.write("<span style='color:#F77;'>[Build Failed]</span>", rich=True)
+    def run_probe(self):
+        self.make_sink.clear()
+        self.probe_btn.setEnabled(False)
+        self.probe_worker = ProbeWorker()
+        self.probe_worker.output_signal.connect(self.make_sink.write, Qt.DirectConnection)
+        self.probe_worker.finished_signal.connect(lambda code: self.probe_btn.setEnabled(True))
+        self.probe_worker.start()
+    def set_low_power(self, on):
+        global LOW_POWER
+        LOW_POWER = bool(on)
+        self.sync_animation()
+    def sync_animation(self):
+        for frame in self.findChildren(NeonFrame):
+            frame.sync_timer()
+    def closeEvent(self, event):
+        # don't leave a tool running behind a destroyed QThread
+        for panel in self.panels:
+            if panel is not None:
+                panel.stop()
+        super().closeEvent(event)
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._painted:
+            self._painted = True
+            self.first_paint.emit(time.monotonic() - STARTED)
+    def changeEvent(self, event):
+        super().changeEvent(event)
+        if event.type() == QEvent.WindowStateChange:
+            self.sync_animation()
+    def mousePressEvent(self, event):
+        if event.button() == Qt.LeftButton:
+            self._drag_active = True
+            self._drag_pos = event.globalPos() - self.frameGeometry().topLeft()
+            event.accept()
+    def mouseMoveEvent(self, event):
+        if self._drag_active:
+            self.move(event.globalPos() - self._drag_pos)
+            event.accept()
+    def mouseReleaseEvent(self, event):
+        self._drag_active = False
+    def toggle_fullscreen(self):
+        if self.isFullScreen():
+            self.showNormal()
+            self.btn_max.setText("▢")
+        else:
+            self.showFullScreen()
+            self.btn_max.setText("❐")
+
+def main():
+    app = QApplication(sys.argv)
+    # A family list lets Qt fall back to Consolas when it first lays out
+    # text, instead of querying the font database (exactMatch) up front,
+    # which is slow over remote X/VNC.
+    font = QFont()
+    font.setFamilies(["Fira Mono", "Consolas"])
+    app.setFont(font)
+    win = DashboardWindow()
+    if os.environ.get("ENCRYD_STARTUP_TIME"):
+        win.first_paint.connect(lambda s: sys.stderr.write(f"First paint after {s * 1000:.0f} ms\n"))
+    win.show()
+    return app.exec_()
+
+if __name__ == "__main__":
+    sys.exit(main())
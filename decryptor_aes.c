@@ -1,13 +1,24 @@
+#define _GNU_SOURCE
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <time.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 #include <openssl/evp.h>
 #include <openssl/err.h>
 
 #define SALT_SIZE 16
 #define IV_SIZE 16
 #define KEY_SIZE 32
-#define BUFFER_SIZE 4096
+#define DEFAULT_BUFFER_SIZE (1 << 20)
+#define MAX_BUFFER_SIZE (1 << 30)
+#define PROGRESS_INTERVAL 0.1
+#define ENGINE_MAGIC "\211ENCRYD\n"
+#define ENGINE_MAGIC_SIZE 8
 
 void handleErrors() {
     ERR_print_errors_fp(stderr);
@@ -19,49 +30,289 @@ void derive_key(const char *password, unsigned char *salt, unsigned char *key) {
         handleErrors();
 }
 
+/* "4096", "64K", "4M" -> bytes; 0 on error */
+size_t parse_size(const char *s) {
+    char *end;
+    unsigned long long n = strtoull(s, &end, 10);
+    if (*end == 'k' || *end == 'K') { n <<= 10; end++; }
+    else if (*end == 'm' || *end == 'M') { n <<= 20; end++; }
+    if (*end || n < 16 || n > MAX_BUFFER_SIZE)
+        return 0;
+    return (size_t)n;
+}
+
+void write_all(int fd, const unsigned char *buf, size_t len) {
+    while (len > 0) {
+        ssize_t n = write(fd, buf, len);
+        if (n < 0) {
+            if (errno == EINTR)
+                continue;
+            perror("Write error");
+            exit(1);
+        }
+        buf += n;
+        len -= n;
+    }
+}
+
+size_t read_full(int fd, unsigned char *buf, size_t len) {
+    size_t got = 0;
+    while (got < len) {
+        ssize_t n = read(fd, buf + got, len - got);
+        if (n < 0 && errno == EINTR)
+            continue;
+        if (n <= 0)
+            break;
+        got += n;
+    }
+    return got;
+}
+
+/* Password from -p FD or -P FILE, or the terminal/stdin as before. Same
+   "%255s" rules either way so all three give the same key. */
+int read_password(char *password, int pass_fd, const char *pass_file, int prompt) {
+    FILE *pf = stdin;
+    if (pass_file)
+        pf = fopen(pass_file, "r");
+    else if (pass_fd >= 0)
+        pf = fdopen(pass_fd, "r");
+    if (!pf) {
+        perror("Password error");
+        return 0;
+    }
+    if (pf == stdin && prompt) {
+        fprintf(prompt > 1 ? stderr : stdout, "Enter password: ");
+        fflush(stdout);
+    }
+    int ok = fscanf(pf, "%255s", password) == 1;
+    if (pf != stdin)
+        fclose(pf);
+    if (!ok)
+        fprintf(stderr, "Password error: no password given\n");
+    return ok;
+}
+
+/* Machine-readable "PROGRESS <done> <total>" records for the dashboard, at
+   most one per PROGRESS_INTERVAL seconds plus a final one. total is 0 when
+   the input size is unknown (pipes). */
+void report_progress(FILE *out, long long done, long long total, int force) {
+    static double last = -1;
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    double now = ts.tv_sec + ts.tv_nsec / 1e9;
+    if (!force && last >= 0 && now - last < PROGRESS_INTERVAL)
+        return;
+    last = now;
+    fprintf(out, "PROGRESS %lld %lld\n", done, total);
+    fflush(out);
+}
+
+/* Reserve the final size up front so the filesystem can lay the file out in
+   one go. Only a hint: filesystems without fallocate are left as they are. */
+void presize(int fd, off_t len) {
+#ifdef __linux__
+    if (len > 0)
+        fallocate(fd, 0, 0, len);
+#endif
+}
+
+/* The last block must unpad under the key, with the block before it (or the
+   IV) as its IV. Catches a wrong password or a damaged or truncated tail
+   before any output exists; with no MAC a wrong password still slips
+   through about 1 time in 256 and is then caught at the end as before. */
+int tail_ok(int fd, off_t size, off_t header, const unsigned char *key, const unsigned char *iv) {
+    off_t body = size - header;
+    unsigned char prev[IV_SIZE], last[IV_SIZE], out[2 * IV_SIZE];
+    int outlen, ok;
+    if (body < IV_SIZE || body % IV_SIZE)
+        return 0;
+    if (body == IV_SIZE)
+        memcpy(prev, iv, IV_SIZE);
+    else if (pread(fd, prev, IV_SIZE, size - 2 * IV_SIZE) != IV_SIZE)
+        return 0;
+    if (pread(fd, last, IV_SIZE, size - IV_SIZE) != IV_SIZE)
+        return 0;
+    EVP_CIPHER_CTX *ctx = EVP_CIPHER_CTX_new();
+    ok = ctx && EVP_DecryptInit_ex(ctx, EVP_aes_256_cbc(), NULL, key, prev)
+         && EVP_DecryptUpdate(ctx, out, &outlen, last, IV_SIZE)
+         && EVP_DecryptFinal_ex(ctx, out + outlen, &outlen);
+    EVP_CIPHER_CTX_free(ctx);
+    return ok;
+}
+
 int main(int argc, char *argv[]) {
-    if (argc != 3) {
-        printf("Usage: %s <input.bin> <output.txt>\n", argv[0]);
+    size_t buffer_size = DEFAULT_BUFFER_SIZE;
+    int use_mmap = 1, pass_fd = -1, progress = 0, opt;
+    const char *pass_file = NULL;
+    while ((opt = getopt(argc, argv, "b:rp:P:g")) != -1) {
+        if (opt == 'b' && (buffer_size = parse_size(optarg)) != 0)
+            continue;
+        if (opt == 'r') {
+            use_mmap = 0;
+            continue;
+        }
+        if (opt == 'p' && (pass_fd = atoi(optarg)) >= 0)
+            continue;
+        if (opt == 'P') {
+            pass_file = optarg;
+            continue;
+        }
+        if (opt == 'g') {
+            progress = 1;
+            continue;
+        }
+        argc = 0;
+        break;
+    }
+    if (argc - optind != 2) {
+        printf("Usage: %s [-b buffer_size] [-r] [-p fd | -P file] [-g] <input.bin> <output.txt>\n", argv[0]);
+        printf("  -b  I/O block size, e.g. 4096, 64K, 4M (default 1M)\n");
+        printf("  -r  plain read() loop instead of mmap\n");
+        printf("  -p  read the password from file descriptor fd\n");
+        printf("  -P  read the password from file\n");
+        printf("  -g  print PROGRESS <done> <total> records while running\n");
+        printf("  Use - as input or output for stdin/stdout.\n");
         return 1;
     }
+    const char *inpath = argv[optind], *outpath = argv[optind + 1];
+    int from_stdin = strcmp(inpath, "-") == 0, to_stdout = strcmp(outpath, "-") == 0;
+    /* status text must not end up in the data stream */
+    FILE *msg = to_stdout ? stderr : stdout;
 
+    if (from_stdin && pass_fd < 0 && !pass_file) {
+        fprintf(stderr, "Reading data from stdin needs the password via -p or -P\n");
+        return 1;
+    }
     char password[256];
-    printf("Enter password: ");
-    scanf("%255s", password);
+    if (!read_password(password, pass_fd, pass_file, to_stdout ? 2 : 1))
+        return 1;
 
-    FILE *fin = fopen(argv[1], "rb");
-    FILE *fout = fopen(argv[2], "wb");
-    if (!fin || !fout) {
+    int fdin = from_stdin ? STDIN_FILENO : open(inpath, O_RDONLY);
+    if (fdin < 0) {
         perror("File error");
         return 1;
     }
 
+    struct stat st;
+    if (fstat(fdin, &st) < 0) {
+        perror("File error");
+        return 1;
+    }
+    int regular = S_ISREG(st.st_mode) && !from_stdin;
+
     unsigned char salt[SALT_SIZE], iv[IV_SIZE], key[KEY_SIZE];
-    fread(salt, 1, SALT_SIZE, fin);
-    fread(iv, 1, IV_SIZE, fin);
+    if (read_full(fdin, salt, SALT_SIZE) != SALT_SIZE || read_full(fdin, iv, IV_SIZE) != IV_SIZE) {
+        fprintf(stderr, "%s is too short to be encrypted\n", inpath);
+        return 1;
+    }
+
+    if (memcmp(salt, ENGINE_MAGIC, ENGINE_MAGIC_SIZE) == 0) {
+        fprintf(stderr, "%s was written by the in-process engine; decrypt it with the engine\n", inpath);
+        return 1;
+    }
 
+    off_t header = SALT_SIZE + IV_SIZE;
     derive_key(password, salt, key);
+    /* reject a bad file before the output is created or truncated */
+    if (regular && !tail_ok(fdin, st.st_size, header, key, iv)) {
+        fprintf(stderr, "%s: wrong password or corrupted file\n", inpath);
+        return 1;
+    }
+
+    int fdout = to_stdout ? STDOUT_FILENO : open(outpath, O_WRONLY | O_CREAT | O_TRUNC, 0666);
+    if (fdout < 0) {
+        perror("File error");
+        return 1;
+    }
+    /* only a regular output file is presized, trimmed or removed on failure;
+       /dev/null, pipes and devices are written to as they are */
+    struct stat ost;
+    int out_regular = !to_stdout && fstat(fdout, &ost) == 0 && S_ISREG(ost.st_mode);
+    if (regular && out_regular && st.st_size > header)
+        presize(fdout, st.st_size - header);
 
     EVP_CIPHER_CTX *ctx = EVP_CIPHER_CTX_new();
     EVP_DecryptInit_ex(ctx, EVP_aes_256_cbc(), NULL, key, iv);
 
-    unsigned char inbuf[BUFFER_SIZE], outbuf[BUFFER_SIZE + EVP_MAX_BLOCK_LENGTH];
-    int inlen, outlen;
+    unsigned char *outbuf = malloc(buffer_size + EVP_MAX_BLOCK_LENGTH);
+    if (!outbuf) {
+        perror("Memory error");
+        return 1;
+    }
+    int outlen;
+    off_t written = 0;
+
+    long long done = header, total = regular ? st.st_size : 0;
+    unsigned char *map = MAP_FAILED;
+    if (use_mmap && regular && st.st_size > header)
+        map = mmap(NULL, st.st_size, PROT_READ, MAP_PRIVATE, fdin, 0);
 
-    while ((inlen = fread(inbuf, 1, BUFFER_SIZE, fin)) > 0) {
-        if (!EVP_DecryptUpdate(ctx, outbuf, &outlen, inbuf, inlen))
-            handleErrors();
-        fwrite(outbuf, 1, outlen, fout);
+    if (map != MAP_FAILED) {
+        madvise(map, st.st_size, MADV_SEQUENTIAL);
+        for (off_t off = header; off < st.st_size; off += buffer_size) {
+            size_t inlen = st.st_size - off < (off_t)buffer_size ? st.st_size - off : buffer_size;
+            if (!EVP_DecryptUpdate(ctx, outbuf, &outlen, map + off, inlen))
+                handleErrors();
+            write_all(fdout, outbuf, outlen);
+            done = off + inlen;
+            if (progress)
+                report_progress(msg, done, total, 0);
+            written += outlen;
+        }
+        munmap(map, st.st_size);
+    } else {
+        unsigned char *inbuf = malloc(buffer_size);
+        if (!inbuf) {
+            perror("Memory error");
+            return 1;
+        }
+        posix_fadvise(fdin, 0, 0, POSIX_FADV_SEQUENTIAL);
+        ssize_t inlen;
+        while ((inlen = read(fdin, inbuf, buffer_size)) != 0) {
+            if (inlen < 0) {
+                if (errno == EINTR)
+                    continue;
+                perror("Read error");
+                return 1;
+            }
+            if (!EVP_DecryptUpdate(ctx, outbuf, &outlen, inbuf, inlen))
+                handleErrors();
+            write_all(fdout, outbuf, outlen);
+            done += inlen;
+            if (progress)
+                report_progress(msg, done, total, 0);
+            written += outlen;
+        }
+        free(inbuf);
     }
 
-    if (!EVP_DecryptFinal_ex(ctx, outbuf, &outlen))
-        handleErrors();
-    fwrite(outbuf, 1, outlen, fout);
+    if (progress)
+        report_progress(msg, done, total, 1);
+
+    if (!EVP_DecryptFinal_ex(ctx, outbuf, &outlen)) {
+        /* only reachable for streams, which skip tail_ok */
+        fprintf(stderr, "%s: wrong password or corrupted file\n", inpath);
+        if (out_regular)
+            remove(outpath);
+        return 1;
+    }
+    write_all(fdout, outbuf, outlen);
+    written += outlen;
+
+    /* the reservation included the padding; trim to what was written */
+    if (out_regular && ftruncate(fdout, written) < 0) {
+        perror("Write error");
+        return 1;
+    }
 
     EVP_CIPHER_CTX_free(ctx);
-    fclose(fin);
-    fclose(fout);
+    free(outbuf);
+    close(fdin);
+    if (close(fdout) < 0) {
+        perror("Write error");
+        return 1;
+    }
 
-    printf("Decryption completed!\n");
+    fprintf(msg, "Decryption completed!\n");
     return 0;
 }
@@ -1,522 +1,198 @@
-import sys, os, subprocess
-from PyQt5.QtWidgets import (
-    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QFormLayout,
-    QLabel, QLineEdit, QPushButton, QFileDialog, QTextEdit, QCheckBox,
-    QProgressBar, QFrame, QSizeGrip, QMessageBox
-)
-from PyQt5.QtCore import Qt, QThread, pyqtSignal, QTimer, QPoint
-from PyQt5.QtGui import (
-    QFont, QColor, QPainter, QBrush, QLinearGradient, QPen, QIcon
-)
+import sys, os, argparse, getpass, json
+import engine
+from jobs import encrypt, decrypt, batch, pack, unpack, verify, describe_exit, probe_report
 
-BIN_DIR = os.path.join(os.path.dirname(__file__), "output")
-def get_bin(name):
-    exe = os.path.join(BIN_DIR, name)
-    if os.name == 'nt':
-        exe += ".exe"
-    return exe
+# Command-line front end. With no arguments it opens the dashboard; PyQt5 is
+# only imported then, so everything below runs on a headless server:
+#   python encryd.py encrypt IN OUT [-b 4M] [--session] [--mode gcm] [--compress] [--resume]
+#   python encryd.py decrypt IN OUT
+#   python encryd.py batch encrypt|decrypt FOLDER_OR_GLOB OUTDIR [--workers N] [--asyncio]
+#   python encryd.py pack FOLDER OUT | unpack ARCHIVE OUTDIR [MEMBER...] | list ARCHIVE
+#   python encryd.py verify FILE... [--full]
+#   python encryd.py probe
+# The same functions (encrypt, decrypt, batch, pack, unpack, verify) can be imported
+# from jobs.
 
-class Worker(QThread):
-    output_signal = pyqtSignal(str)
-    finished_signal = pyqtSignal(int)
-    def __init__(self, args, password=None):
-        super().__init__()
-        self.args = args
-        self.password = password
-    def run(self):
-        try:
-            p = subprocess.Popen(
-                self.args,
-                stdin=subprocess.PIPE if self.password else None,
-                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                bufsize=1, universal_newlines=True,
-            )
-            if self.password:
-                p.stdin.write(self.password + "\n")
-                p.stdin.flush()
-            for line in p.stdout:
-                self.output_signal.emit(line)
-            code = p.wait()
-            self.finished_signal.emit(code)
-        except Exception as e:
-            self.output_signal.emit(f"Error: {e}\n")
-            self.finished_signal.emit(-1)
-
-class MakeWorker(QThread):
-    output_signal = pyqtSignal(str)
-    finished_signal = pyqtSignal(int)
-    def run(self):
-        try:
-            p = subprocess.Popen(
-                ["make"],
-                cwd=os.path.dirname(__file__),
-                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
-                bufsize=1, universal_newlines=True,
-            )
-            for line in p.stdout:
-                self.output_signal.emit(line)
-            code = p.wait()
-            self.finished_signal.emit(code)
-        except Exception as e:
-            self.output_signal.emit(f"Make Error: {e}\n")
-            self.finished_signal.emit(-1)
-
-class NeonFrame(QFrame):
-    def __init__(self, parent=None, color1="#00fff7", color2="#2dffae"):
-        super().__init__(parent)
-        self.setStyleSheet("background: rgba(24, 28, 32, 0.82); border-radius: 22px;")
-        self.color1 = QColor(color1)
-        self.color2 = QColor(color2)
-        self._anim_val = 0
-        self._timer = QTimer(self)
-        self._timer.timeout.connect(self.animate)
-        self._timer.start(30)
-    def animate(self):
-        self._anim_val = (self._anim_val + 4) % 360
-        self.update()
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        qp = QPainter(self)
-        qp.setRenderHint(QPainter.Antialiasing)
-        r = self.rect().adjusted(5,5,-5,-5)
-        # Hi-tech glowing border: double neon gradient, animated
-        grad_outer = QLinearGradient(r.topLeft(), r.bottomRight())
-        grad_outer.setColorAt(0, self.color1.lighter(160))
-        grad_outer.setColorAt(0.5, self.color2.lighter(180))
-        grad_outer.setColorAt(1, self.color1.lighter(160))
-        pen_outer = QPen(QBrush(grad_outer), 5)
-        pen_outer.setCapStyle(Qt.RoundCap)
-        pen_outer.setJoinStyle(Qt.RoundJoin)
-        qp.setPen(pen_outer)
-        qp.drawRoundedRect(r, 22, 22)
-        # Animated dashed inner border
-        grad_inner = QLinearGradient(r.topRight(), r.bottomLeft())
-        grad_inner.setColorAt(0, self.color2.lighter(230))
-        grad_inner.setColorAt(1, self.color1.lighter(230))
-        pen_inner = QPen(QBrush(grad_inner), 2)
-        pen_inner.setStyle(Qt.DotLine)
-        pen_inner.setDashOffset(self._anim_val)
-        qp.setPen(pen_inner)
-        r_inner = r.adjusted(6,6,-6,-6)
-        qp.drawRoundedRect(r_inner, 15, 15)
-        # Optional: draw "corner widgets" for more hitec look
-        for corner in [r_inner.topLeft(), r_inner.topRight(), r_inner.bottomLeft(), r_inner.bottomRight()]:
-            qp.setBrush(QBrush(self.color1.lighter(180)))
-            qp.setPen(Qt.NoPen)
-            qp.drawEllipse(corner, 7, 7)
+def read_password(opts):
+    # Same rules as the tools: the first whitespace-separated word is used.
+    if opts.password_file:
+        with open(opts.password_file) as f:
+            text = f.read()
+    elif opts.password_fd is not None:
+        with os.fdopen(opts.password_fd) as f:
+            text = f.read()
+    elif sys.stdin.isatty():
+        text = getpass.getpass("Enter password: ", stream=sys.stderr)
+    else:
+        raise SystemExit("encryd: no terminal for the password; use --password-file or --password-fd")
+    password = engine.tool_password(text)
+    if not password:
+        raise SystemExit("encryd: no password given")
+    return password
 
-class TerminalOutput(QTextEdit):
-    def __init__(self):
-        super().__init__()
-        self.setReadOnly(True)
-        self.setFont(QFont("Fira Mono", 13))
-        self.setStyleSheet("""
-            background: #101215;
-            color: #00fff7;
-            border-radius: 12px;
-            padding: 10px;
-            selection-background-color: #38006e;
-        """)
-        self.setCursorWidth(2)
-        self._scanline_timer = QTimer(self)
-        self._scanline_timer.timeout.connect(self.repaint)
-        self._scanline_timer.start(30)
-    def paintEvent(self, event):
-        super().paintEvent(event)
-        qp = QPainter(self.viewport())
-        h = self.viewport().height()
-        w = self.viewport().width()
-        qp.setOpacity(0.14)
-        for y in range(0, h, 4):
-            qp.fillRect(0, y, w, 2, QColor("#00fff7"))
+def show_progress(done, total):
+    if total > 0:
+        sys.stderr.write(f"\r{done * 100 // total:3d}%  {done / 1e6:.1f}/{total / 1e6:.1f} MB")
+        if done == total:
+            sys.stderr.write("\n")
+    else:
+        sys.stderr.write(f"\r{done / 1e6:.1f} MB")
+    sys.stderr.flush()
 
-class Sidebar(QWidget):
-    tabChanged = pyqtSignal(int)
-    def __init__(self, tabs):
-        super().__init__()
-        self.layout = QVBoxLayout(self)
-        self.layout.setContentsMargins(4,4,4,4)
-        self.layout.setSpacing(12)
-        self.buttons = []
-        for idx, (name, icon) in enumerate(tabs):
-            btn = QPushButton(icon + "  " + name)
-            btn.setFont(QFont("Fira Mono", 13, QFont.Bold))
-            btn.setStyleSheet("""
-                QPushButton {
-                    background: #101215;
-                    color: #0FF;
-                    border: 2px solid #222;
-                    border-radius: 10px;
-                    padding: 12px 10px;
-                    text-align: left;
-                }
-                QPushButton:hover, QPushButton:checked {
-                    background: #181C20;
-                    color: #F0F;
-                    border: 2px solid #0FF;
-                }
-            """)
-            btn.setCheckable(True)
-            btn.clicked.connect(lambda checked, i=idx: self.change_tab(i))
-            self.layout.addWidget(btn)
-            self.buttons.append(btn)
-        self.layout.addStretch()
-        self.setFixedWidth(180)
-        self.change_tab(0)
-    def change_tab(self, idx):
-        for i, btn in enumerate(self.buttons):
-            btn.setChecked(i==idx)
-        self.tabChanged.emit(idx)
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-b", "--block-size", metavar="SIZE", help="I/O block size, e.g. 64K or 4M (default 1M)")
+    common.add_argument("--binary", action="store_true", help="run the C tools instead of the in-process engine")
+    common.add_argument("--password-file", metavar="FILE", help="read the password from FILE")
+    common.add_argument("--password-fd", metavar="FD", type=int, help="read the password from file descriptor FD")
+    common.add_argument("--progress", action="store_true", help="show progress on stderr")
+    common.add_argument("-q", "--quiet", action="store_true", help="print nothing unless it fails")
+    enc = argparse.ArgumentParser(add_help=False)
+    enc.add_argument("--session", action="store_true", help="derive per-file keys from one session key (engine only)")
+    enc.add_argument("--mode", choices=["cbc", "gcm", "ctr", "chacha20", "auto"],
+                     help="cipher: cbc (compatible with the C tools), gcm, ctr or chacha20 "
+                          "(parallel segments, engine only); auto picks by CPU")
+    enc.add_argument("--gcm", action="store_const", dest="mode", const="gcm", help="same as --mode gcm")
+    enc.add_argument("--resume", action="store_true",
+                     help="checkpoint the output and continue an interrupted run (engine only)")
+    enc.add_argument("--compress", nargs="?", const="auto", choices=["auto", "zlib", "zstd"],
+                     help="compress before encrypting; auto = zstd if installed, else zlib (engine only)")
 
-class BasePanel(QWidget):
-    def __init__(self, title, icon, operation_fields, run_callback):
-        super().__init__()
-        neon = NeonFrame()
-        vbox = QVBoxLayout(neon)
-        vbox.setContentsMargins(24,24,24,24)
-        head = QLabel(f"{icon}  <span style='font-size:22px;'>{title}</span>")
-        head.setTextFormat(Qt.RichText)
-        head.setStyleSheet("color: #fff; letter-spacing:3px; margin-bottom:12px;")
-        head.setFont(QFont("Fira Mono", 18, QFont.Bold))
-        vbox.addWidget(head)
-        form = QFormLayout()
-        self.fields = {}
-        for label, field_type, *rest in operation_fields:
-            field = None
-            if field_type == "file":
-                field = QLineEdit()
-                field.setPlaceholderText("Choose file...")
-                field.setMinimumHeight(35)
-                field.setFont(QFont("Fira Mono", 12))
-                field.setStyleSheet("""
-                    background: #23242A;
-                    color: #FFF;
-                    border-radius: 7px;
-                    border: 2px solid #2DFFAE;
-                    padding-left: 10px;
-                """)
-                btn = QPushButton("FILE")
-                btn.setMaximumWidth(40)
-                btn.setMinimumHeight(35)
-                btn.setStyleSheet("""
-                    background:#101215;color:#0FF;
-                    border-radius:7px;
-                """)
-                btn.clicked.connect(lambda _, f=field: self._pick_file(f, rest[0] if rest else "open"))
-                h = QHBoxLayout(); h.setContentsMargins(0,0,0,0)
-                h.addWidget(field); h.addWidget(btn)
-                w = QWidget(); w.setLayout(h)
-                form.addRow(label, w)
-            elif field_type == "savefile":
-                field = QLineEdit()
-                field.setPlaceholderText("Choose save location...")
-                field.setMinimumHeight(35)
-                field.setFont(QFont("Fira Mono", 12))
-                field.setStyleSheet("""
-                    background: #23242A;
-                    color: #FFF;
-                    border-radius: 7px;
-                    border: 2px solid #2DFFAE;
-                    padding-left: 10px;
-                """)
-                btn = QPushButton("SAVE")
-                btn.setMaximumWidth(40)
-                btn.setMinimumHeight(35)
-                btn.setStyleSheet("""
-                    background:#101215;color:#0FF;
-                    border-radius:7px;
-                """)
-                btn.clicked.connect(lambda _, f=field: self._pick_file(f, "save"))
-                h = QHBoxLayout(); h.setContentsMargins(0,0,0,0)
-                h.addWidget(field); h.addWidget(btn)
-                w = QWidget(); w.setLayout(h)
-                form.addRow(label, w)
-            elif field_type == "password":
-                field = QLineEdit()
-                field.setEchoMode(QLineEdit.Password)
-                field.setMinimumHeight(35)
-                field.setFont(QFont("Fira Mono", 12))
-                field.setStyleSheet("""
-                    background: #23242A;
-                    color: #FFF;
-                    border-radius: 7px;
-                    border: 2px solid #2DFFAE;
-                    padding-left: 10px;
-                """)
-                cb = QCheckBox("👁 Show")
-                cb.setStyleSheet("color: #0FF;")
-                cb.setMinimumHeight(35)
-                cb.stateChanged.connect(lambda x, f=field: f.setEchoMode(QLineEdit.Normal if x else QLineEdit.Password))
-                h = QHBoxLayout(); h.setContentsMargins(0,0,0,0)
-                h.addWidget(field); h.addWidget(cb)
-                w = QWidget(); w.setLayout(h)
-                form.addRow(label, w)
-            else:
-                field = QLineEdit()
-                field.setMinimumHeight(35)
-                field.setFont(QFont("Fira Mono", 12))
-                field.setStyleSheet("""
-                    background: #23242A;
-                    color: #FFF;
-                    border-radius: 7px;
-                    border: 2px solid #2DFFAE;
-                    padding-left: 10px;
-                """)
-                form.addRow(label, field)
-            self.fields[label] = field
-        vbox.addLayout(form)
-        self.outterm = TerminalOutput()
-        vbox.addWidget(self.outterm, 1)
-        self.progress = QProgressBar()
-        self.progress.setMaximum(0)
-        self.progress.setMinimum(0)
-        self.progress.setVisible(False)
-        self.progress.setStyleSheet("""
-            QProgressBar {
-                background: #101215;
-                border: 2px solid #0FF;
-                border-radius: 8px;
-                text-align: center;
-                color: #0FF;
-                font-size: 15px;
-            }
-            QProgressBar::chunk {
-                background: qlineargradient(
-                    x1:0, y1:0, x2:1, y2:0,
-                    stop:0 #1FF7E0, stop:1 #2DFFAE
-                );
-                border-radius: 8px;
-            }
-        """)
-        vbox.addWidget(self.progress)
-        self.run_btn = QPushButton("▶ Run")
-        self.run_btn.setFont(QFont("Fira Mono", 17, QFont.Bold))
-        self.run_btn.setMinimumHeight(45)
-        self.run_btn.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0FF, stop:1 #1FF7E0);
-                color: #181C20;
-                border-radius: 14px;
-                border: 2px solid #0FF;
-                padding: 12px 30px;
-                font-size: 17px;
-            }
-            QPushButton:hover {
-                background: #1FF7E0;
-                color: #fff;
-                border: 2px solid #2DFFAE;
-            }
-        """)
-        self.run_btn.clicked.connect(lambda: run_callback(self))
-        vbox.addWidget(self.run_btn)
-        self.setLayout(QVBoxLayout())
-        self.layout().addWidget(neon)
+    parser = argparse.ArgumentParser(prog="encryd", description="Encrypt and decrypt files without the dashboard.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p = sub.add_parser("encrypt", parents=[common, enc], help="encrypt one file (- for stdin/stdout)")
+    p.add_argument("input")
+    p.add_argument("output")
+    p = sub.add_parser("decrypt", parents=[common], help="decrypt one file (- for stdin/stdout)")
+    p.add_argument("input")
+    p.add_argument("output")
+    p = sub.add_parser("batch", parents=[common, enc], help="encrypt or decrypt a folder or glob")
+    p.add_argument("op", choices=["encrypt", "decrypt"])
+    p.add_argument("pattern", help="folder or quoted glob")
+    p.add_argument("outdir")
+    p.add_argument("--workers", type=int, help="concurrent jobs (default: CPU count)")
+    p.add_argument("--retries", type=int, default=1, help="retries per failed file (default 1)")
+    p.add_argument("--incremental", action="store_true",
+                   help="skip files unchanged since the last run (manifest kept in OUTDIR)")
+    p.add_argument("--asyncio", action="store_true",
+                   help="run the binaries on one event loop instead of a thread each (for large --workers)")
+    p = sub.add_parser("pack", parents=[common], help="encrypt a folder into one container (engine only)")
+    p.add_argument("input", help="folder")
+    p.add_argument("output")
+    p.add_argument("--session", action="store_true", help="derive the key from the cached session key")
+    p.add_argument("--no-compress", action="store_true", help="store file data without zlib")
+    p = sub.add_parser("unpack", parents=[common], help="extract a container, or just some members of it")
+    p.add_argument("input")
+    p.add_argument("output", help="destination folder")
+    p.add_argument("members", nargs="*", help="paths inside the container (folders select their contents)")
+    p = sub.add_parser("list", parents=[common], help="list the contents of a container")
+    p.add_argument("input")
+    p = sub.add_parser("verify", parents=[common], help="check files decrypt without writing anything (engine only)")
+    p.add_argument("inputs", nargs="+", metavar="input")
+    p.add_argument("--full", action="store_true",
+                   help="authenticate every segment instead of only the header and the end")
+    p = sub.add_parser("probe", help="report CPU crypto features and per-cipher throughput")
+    p.add_argument("--json", action="store_true")
+    sub.add_parser("gui", help="open the dashboard (the default with no arguments)")
+    return parser
 
-    def _pick_file(self, field, mode):
-        dlg = QFileDialog(self)
-        dlg.setStyleSheet("""
-            * { color: #fff; background: #23242A; }
-            QLineEdit, QLabel, QTreeView, QListView, QHeaderView { color: #fff; background: #000000; }
-            QPushButton { color: #fff; background: #101215; border-radius:6px;}
-            QDialogButtonBox QPushButton { color: #fff; }
-        """)
-        if mode=="open":
-            dlg.setFileMode(QFileDialog.ExistingFile)
-            if dlg.exec_():
-                files = dlg.selectedFiles()
-                if files:
-                    field.setText(files[0])
-        else:
-            dlg.setAcceptMode(QFileDialog.AcceptSave)
-            if dlg.exec_():
-                files = dlg.selectedFiles()
-                if files:
-                    field.setText(files[0])
-
-    def log(self, msg):
-        self.outterm.append(msg)
-    def run_worker(self, args, password=None):
-        self.outterm.clear()
-        self.progress.setVisible(True)
-        self.worker = Worker(args, password)
-        self.worker.output_signal.connect(self.log)
-        self.worker.finished_signal.connect(self.on_finished)
-        self.worker.start()
-    def on_finished(self, code):
-        self.progress.setVisible(False)
-        if code == 0:
-            self.log("<span style='color:#0f0;'>\n[Success]</span>")
-        else:
-            self.log("<span style='color:#F77;'>\n[Failed. Exit code: %s]</span>"%code)
-
-class DashboardWindow(QWidget):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle("ENCRYD_v1")
-        self.setWindowFlags(Qt.FramelessWindowHint | Qt.Window)
-        self.setAttribute(Qt.WA_TranslucentBackground)
-        self.resize(1250, 930)
-        self.setMinimumSize(700, 400)
-        neon = NeonFrame()
-        neon.setStyleSheet("background: rgba(24,28,32,0.82); border-radius: 24px;")
-        layout = QHBoxLayout(neon)
-        layout.setContentsMargins(0,0,0,0)
-        sidebar = Sidebar([
-            ("Encrypt", "🔒"),
-            ("Decrypt", "🔓"),
-        ])
-        layout.addWidget(sidebar)
-        self.panels = []
-        def make_panel(tab):
-            if tab==0: # Encrypt
-                return BasePanel("Encrypt", "🔒", [
-                    ("Input file", "file"),
-                    ("Output file", "savefile"),
-                    ("Password", "password"),
-                ], self.run_encrypt)
-            elif tab==1: # Decrypt
-                return BasePanel("Decrypt", "🔓", [
-                    ("Encrypted file", "file"),
-                    ("Output file", "savefile"),
-                    ("Password", "password"),
-                ], self.run_decrypt)
-        self.stack = QWidget()
-        self.stack_layout = QVBoxLayout(self.stack)
-        self.stack_layout.setContentsMargins(0,0,0,0)
-        self.stack_layout.setSpacing(0)
-        for i in range(2):
-            p = make_panel(i)
-            self.panels.append(p)
-            p.setVisible(i==0)
-            self.stack_layout.addWidget(p)
-        layout.addWidget(self.stack, 1)
-        neon_layout = QVBoxLayout(self)
-        neon_layout.setContentsMargins(20, 20, 20, 20)
-        neon_layout.addWidget(neon)
-        # Top bar with title and window controls
-        toph = QHBoxLayout()
-        self.dashboard = QLabel("""
-<span style='color:#0FF;font-size:38px;font-weight:bold;'>ENCRYD_v1</span><br>
-<span style='color:#2DFFAE;font-size:19px;'>  Made By WebDragon63</span>
-""")
-        self.dashboard.setAlignment(Qt.AlignCenter)
-        self.dashboard.setStyleSheet("padding: 22px; letter-spacing:3px;")
-        toph.addWidget(self.dashboard, 1)
-        # Window control buttons (minimize, maximize/restore, close)
-        btnbar = QHBoxLayout()
-        btnbar.setSpacing(8)
-        self.btn_min = QPushButton("—")
-        self.btn_min.setFixedSize(32, 32)
-        self.btn_min.setStyleSheet("background:#101215;color:#0FF;font-size:20px;border-radius:9px;")
-        self.btn_min.clicked.connect(self.showMinimized)
-        self.btn_max = QPushButton("▢")
-        self.btn_max.setFixedSize(32, 32)
-        self.btn_max.setStyleSheet("background:#101215;color:#0FF;font-size:18px;border-radius:9px;")
-        self.btn_max.clicked.connect(self.toggle_fullscreen)
-        self.btn_close = QPushButton("✕")
-        self.btn_close.setFixedSize(32, 32)
-        self.btn_close.setStyleSheet("background:#101215;color:#F77;font-size:16px;border-radius:9px;")
-        self.btn_close.clicked.connect(self.close)
-        btnbar.addWidget(self.btn_min)
-        btnbar.addWidget(self.btn_max)
-        btnbar.addWidget(self.btn_close)
-        toph.addLayout(btnbar)
-        neon_layout.insertLayout(0, toph)
-        sidebar.tabChanged.connect(self.set_tab)
-        self.sizegrip = QSizeGrip(self)
-        neon_layout.addWidget(self.sizegrip, 0, Qt.AlignBottom | Qt.AlignRight)
-        # Build/Make button
-        self.make_btn = QPushButton("🛠 Build C Binaries")
-        self.make_btn.setFont(QFont("Fira Mono", 13, QFont.Bold))
-        self.make_btn.setMinimumHeight(45)
-        self.make_btn.setStyleSheet("""
-            QPushButton {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #0FF, stop:1 #1FF7E0);
-                color: #181C20;
-                border-radius: 10px;
-                border: 2px solid #0FF;
-                padding: 8px 16px;
-                font-size: 17px;
-            }
-            QPushButton:hover {
-                background: #1FF7E0;
-                color: #000;
-                border: 2px solid #2DFFAE;
-            }
-        """)
-        self.make_btn.clicked.connect(self.run_make)
-        neon_layout.addWidget(self.make_btn, 0, Qt.AlignTop)
-        # Panel to show make output
-        self.make_term = TerminalOutput()
-        self.make_term.setFixedHeight(120)
-        neon_layout.addWidget(self.make_term, 0, Qt.AlignTop)
-        self._drag_active = False
-        self._drag_pos = None
-
-    def set_tab(self, idx):
-        for i, p in enumerate(self.panels):
-            p.setVisible(i==idx)
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] == "gui":
+        import dashboard
+        return dashboard.main()
+    opts = build_parser().parse_args(argv)
+    if opts.command == "probe":
+        if not engine.available():
+            raise SystemExit("encryd: libcrypto not found")
+        result = engine.probe()
+        print(json.dumps(result, indent=2) if opts.json else "\n".join(probe_report(result)))
+        return 0
+    flags = []
+    if opts.block_size:
+        try:
+            engine.parse_size(opts.block_size)
+        except ValueError as e:
+            raise SystemExit(f"encryd: {e}")
+        flags = ["-b", opts.block_size]
+    options = {}
+    if getattr(opts, "session", False):
+        options["session"] = True
+    if getattr(opts, "mode", None) not in (None, "cbc"):
+        options["mode"] = opts.mode
+    if getattr(opts, "compress", None):
+        options["compress"] = opts.compress
+    if getattr(opts, "resume", False):
+        options["resume"] = True
+    if opts.binary and options:
+        raise SystemExit("encryd: --session, --mode, --compress and --resume need the in-process engine")
+    if opts.command == "batch" and opts.op == "decrypt" and options:
+        raise SystemExit("encryd: --session, --mode, --compress and --resume only apply to encryption")
+    if options.get("resume") and options.get("compress"):
+        raise SystemExit("encryd: --resume can't be combined with --compress")
+    if opts.binary and opts.command in ("pack", "unpack", "list"):
+        raise SystemExit("encryd: containers need the in-process engine")
+    if opts.binary and opts.command == "verify":
+        raise SystemExit("encryd: verify needs the in-process engine")
+    streaming = opts.command in ("encrypt", "decrypt") and "-" in (opts.input, opts.output)
+    if opts.binary and streaming:
+        raise SystemExit("encryd: stdin/stdout streaming needs the in-process engine")
+    if not opts.binary and not engine.available():
+        raise SystemExit("encryd: libcrypto not found; use --binary")
+    password = read_password(opts)
+    in_process = not opts.binary
 
-    def run_encrypt(self, panel):
-        infile = panel.fields["Input file"].text()
-        outfile = panel.fields["Output file"].text()
-        password = panel.fields["Password"].text()
-        if not (infile and outfile and password):
-            panel.log("<span style='color:#F77;'>Please provide all fields.</span>")
+    def out(line):
+        # the binaries prompt even when the password comes from a pipe
+        if line.startswith("Enter password: "):
+            line = line[len("Enter password: "):]
+        if not line.strip():
             return
-        # Always output .bin for encryption
-        if not outfile.lower().endswith('.bin'):
-            outfile += '.bin'
-            panel.fields["Output file"].setText(outfile)
-        args = [get_bin("encryptor"), infile, outfile]
-        panel.run_worker(args, password=password)
-    def run_decrypt(self, panel):
-        infile = panel.fields["Encrypted file"].text()
-        outfile = panel.fields["Output file"].text()
-        password = panel.fields["Password"].text()
-        if not (infile and outfile and password):
-            panel.log("<span style='color:#F77;'>Please provide all fields.</span>")
-            return
-        args = [get_bin("decryptor"), infile, outfile]
-        panel.run_worker(args, password=password)
-    def run_make(self):
-        self.make_term.clear()
-        self.make_btn.setEnabled(False)
-        self.make_worker = MakeWorker()
-        self.make_worker.output_signal.connect(self.make_term.append)
-        self.make_worker.finished_signal.connect(self.make_done)
-        self.make_worker.start()
-    def make_done(self, code):
-        self.make_btn.setEnabled(True)
-        if code == 0:
-            self.make_term.append("<span style='color:#0f0;'>[Build Success]</span>")
-        else:
-            self.make_term.append("<span style='color:#F77;'>[Build Failed]</span>")
-    def mousePressEvent(self, event):
-        if event.button() == Qt.LeftButton:
-            self._drag_active = True
-            self._drag_pos = event.globalPos() - self.frameGeometry().topLeft()
-            event.accept()
-    def mouseMoveEvent(self, event):
-        if self._drag_active:
-            self.move(event.globalPos() - self._drag_pos)
-            event.accept()
-    def mouseReleaseEvent(self, event):
-        self._drag_active = False
-    def toggle_fullscreen(self):
-        if self.isFullScreen():
-            self.showNormal()
-            self.btn_max.setText("▢")
+        if opts.quiet:
+            held.append(line)
         else:
-            self.showFullScreen()
-            self.btn_max.setText("❐")
+            sys.stderr.write(line)
+    held = []
+    progress = show_progress if opts.progress else None
+    if opts.command == "list":
+        try:
+            entries = engine.pack_index(opts.input, password)
+        except (engine.EngineError, OSError) as e:
+            sys.stderr.write(f"Error: {e}\n")
+            return 1
+        for e in entries:
+            size = e.get("size", 0) if e["type"] == "file" else e["type"]
+            print(f"{size:>12} {e['path']}" + (f" -> {e['target']}" if e["type"] == "link" else ""))
+        return 0
+    if opts.command == "verify":
+        code = 0
+        for path in opts.inputs:
+            lines = []
+            result = verify(path, password, opts.full, flags, lines.append, progress)
+            summary = "".join(l for l in lines if l.strip() != "Verification passed!").strip()
+            print(f"{path}: " + (summary if result == 0 else describe_exit(result) + " " + summary))
+            code = code or result
+        return code
+    if opts.command == "pack":
+        code = pack(opts.input, opts.output, password, flags, out, progress,
+                    compress=not opts.no_compress, **options)
+    elif opts.command == "unpack":
+        code = unpack(opts.input, opts.output, password, opts.members, flags, out, progress)
+    elif opts.command == "batch":
+        code = batch(opts.op, opts.pattern, opts.outdir, password, flags, in_process,
+                     opts.workers, opts.retries, on_output=out, incremental=opts.incremental,
+                     use_asyncio=opts.asyncio, **options)
+    elif opts.command == "encrypt":
+        code = encrypt(opts.input, opts.output, password, flags, in_process, out, progress, **options)
+    else:
+        code = decrypt(opts.input, opts.output, password, flags, in_process, out, progress)
+    if code != 0 or not opts.quiet:
+        sys.stderr.write("".join(held if code else []) + describe_exit(code) + "\n")
+    return code
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
-    font = QFont("Fira Mono")
-    if not font.exactMatch():
-        font = QFont("Consolas")
-    app.setFont(font)
-    win = DashboardWindow()
-    win.show()
-    sys.exit(app.exec_())
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.stderr.write("\n" + describe_exit(engine.EXIT_CANCELLED) + "\n")
+        sys.exit(engine.EXIT_CANCELLED)
@@ -1,6 +1,13 @@
+#define _GNU_SOURCE
 #include <stdio.h>
 #include <stdlib.h>
 #include <string.h>
+#include <errno.h>
+#include <fcntl.h>
+#include <unistd.h>
+#include <time.h>
+#include <sys/mman.h>
+#include <sys/stat.h>
 #include <openssl/evp.h>
 #include <openssl/rand.h>
 #include <openssl/err.h>
@@ -8,7 +15,9 @@
 #define SALT_SIZE 16
 #define IV_SIZE 16
 #define KEY_SIZE 32
-#define BUFFER_SIZE 4096
+#define DEFAULT_BUFFER_SIZE (1 << 20)
+#define MAX_BUFFER_SIZE (1 << 30)
+#define PROGRESS_INTERVAL 0.1
 
 void handleErrors() {
     ERR_print_errors_fp(stderr);
@@ -20,22 +29,141 @@ void derive_key(const char *password, unsigned char *salt, unsigned char *key) {
         handleErrors();
 }
 
+/* "4096", "64K", "4M" -> bytes; 0 on error */
+size_t parse_size(const char *s) {
+    char *end;
+    unsigned long long n = strtoull(s, &end, 10);
+    if (*end == 'k' || *end == 'K') { n <<= 10; end++; }
+    else if (*end == 'm' || *end == 'M') { n <<= 20; end++; }
+    if (*end || n < 16 || n > MAX_BUFFER_SIZE)
+        return 0;
+    return (size_t)n;
+}
+
+void write_all(int fd, const unsigned char *buf, size_t len) {
+    while (len > 0) {
+        ssize_t n = write(fd, buf, len);
+        if (n < 0) {
+            if (errno == EINTR)
+                continue;
+            perror("Write error");
+            exit(1);
+        }
+        buf += n;
+        len -= n;
+    }
+}
+
+/* Password from -p FD or -P FILE, or the terminal/stdin as before. Same
+   "%255s" rules either way so all three give the same key. */
+int read_password(char *password, int pass_fd, const char *pass_file, int prompt) {
+    FILE *pf = stdin;
+    if (pass_file)
+        pf = fopen(pass_file, "r");
+    else if (pass_fd >= 0)
+        pf = fdopen(pass_fd, "r");
+    if (!pf) {
+        perror("Password error");
+        return 0;
+    }
+    if (pf == stdin && prompt) {
+        fprintf(prompt > 1 ? stderr : stdout, "Enter password: ");
+        fflush(stdout);
+    }
+    int ok = fscanf(pf, "%255s", password) == 1;
+    if (pf != stdin)
+        fclose(pf);
+    if (!ok)
+        fprintf(stderr, "Password error: no password given\n");
+    return ok;
+}
+
+/* Machine-readable "PROGRESS <done> <total>" records for the dashboard, at
+   most one per PROGRESS_INTERVAL seconds plus a final one. total is 0 when
+   the input size is unknown (pipes). */
+void report_progress(FILE *out, long long done, long long total, int force) {
+    static double last = -1;
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    double now = ts.tv_sec + ts.tv_nsec / 1e9;
+    if (!force && last >= 0 && now - last < PROGRESS_INTERVAL)
+        return;
+    last = now;
+    fprintf(out, "PROGRESS %lld %lld\n", done, total);
+    fflush(out);
+}
+
+/* Reserve the final size up front so the filesystem can lay the file out in
+   one go. Only a hint: filesystems without fallocate are left as they are. */
+void presize(int fd, off_t len) {
+#ifdef __linux__
+    if (len > 0)
+        fallocate(fd, 0, 0, len);
+#endif
+}
+
 int main(int argc, char *argv[]) {
-    if (argc != 3) {
-        printf("Usage: %s <input.txt> <output.bin>\n", argv[0]);
+    size_t buffer_size = DEFAULT_BUFFER_SIZE;
+    int use_mmap = 1, pass_fd = -1, progress = 0, opt;
+    const char *pass_file = NULL;
+    while ((opt = getopt(argc, argv, "b:rp:P:g")) != -1) {
+        if (opt == 'b' && (buffer_size = parse_size(optarg)) != 0)
+            continue;
+        if (opt == 'r') {
+            use_mmap = 0;
+            continue;
+        }
+        if (opt == 'p' && (pass_fd = atoi(optarg)) >= 0)
+            continue;
+        if (opt == 'P') {
+            pass_file = optarg;
+            continue;
+        }
+        if (opt == 'g') {
+            progress = 1;
+            continue;
+        }
+        argc = 0;
+        break;
+    }
+    if (argc - optind != 2) {
+        printf("Usage: %s [-b buffer_size] [-r] [-p fd | -P file] [-g] <input.txt> <output.bin>\n", argv[0]);
+        printf("  -b  I/O block size, e.g. 4096, 64K, 4M (default 1M)\n");
+        printf("  -r  plain read() loop instead of mmap\n");
+        printf("  -p  read the password from file descriptor fd\n");
+        printf("  -P  read the password from file\n");
+        printf("  -g  print PROGRESS <done> <total> records while running\n");
+        printf("  Use - as input or output for stdin/stdout.\n");
         return 1;
     }
+    const char *inpath = argv[optind], *outpath = argv[optind + 1];
+    int from_stdin = strcmp(inpath, "-") == 0, to_stdout = strcmp(outpath, "-") == 0;
+    /* status text must not end up in the data stream */
+    FILE *msg = to_stdout ? stderr : stdout;
 
+    if (from_stdin && pass_fd < 0 && !pass_file) {
+        fprintf(stderr, "Reading data from stdin needs the password via -p or -P\n");
+        return 1;
+    }
     char password[256];
-    printf("Enter password: ");
-    scanf("%255s", password);
+    if (!read_password(password, pass_fd, pass_file, to_stdout ? 2 : 1))
+        return 1;
+
+    int fdin = from_stdin ? STDIN_FILENO : open(inpath, O_RDONLY);
+    int fdout = to_stdout ? STDOUT_FILENO : open(outpath, O_WRONLY | O_CREAT | O_TRUNC, 0666);
+    if (fdin < 0 || fdout < 0) {
+        perror("File error");
+        return 1;
+    }
 
-    FILE *fin = fopen(argv[1], "rb");
-    FILE *fout = fopen(argv[2], "wb");
-    if (!fin || !fout) {
+    struct stat st;
+    if (fstat(fdin, &st) < 0) {
         perror("File error");
         return 1;
     }
+    int regular = S_ISREG(st.st_mode) && !from_stdin;
+    if (regular && !to_stdout)
+        presize(fdout, SALT_SIZE + IV_SIZE + (st.st_size / 16 + 1) * 16);
 
     unsigned char salt[SALT_SIZE], iv[IV_SIZE], key[KEY_SIZE];
     RAND_bytes(salt, sizeof(salt));
@@ -43,29 +171,76 @@ int main(int argc, char *argv[]) {
 
     derive_key(password, salt, key);
 
-    fwrite(salt, 1, SALT_SIZE, fout);
-    fwrite(iv, 1, IV_SIZE, fout);
+    write_all(fdout, salt, SALT_SIZE);
+    write_all(fdout, iv, IV_SIZE);
 
     EVP_CIPHER_CTX *ctx = EVP_CIPHER_CTX_new();
     EVP_EncryptInit_ex(ctx, EVP_aes_256_cbc(), NULL, key, iv);
 
-    unsigned char inbuf[BUFFER_SIZE], outbuf[BUFFER_SIZE + EVP_MAX_BLOCK_LENGTH];
-    int inlen, outlen;
+    unsigned char *outbuf = malloc(buffer_size + EVP_MAX_BLOCK_LENGTH);
+    if (!outbuf) {
+        perror("Memory error");
+        return 1;
+    }
+    int outlen;
+
+    long long done = 0, total = regular ? st.st_size : 0;
+    unsigned char *map = MAP_FAILED;
+    if (use_mmap && regular && st.st_size > 0)
+        map = mmap(NULL, st.st_size, PROT_READ, MAP_PRIVATE, fdin, 0);
 
-    while ((inlen = fread(inbuf, 1, BUFFER_SIZE, fin)) > 0) {
-        if (!EVP_EncryptUpdate(ctx, outbuf, &outlen, inbuf, inlen))
-            handleErrors();
-        fwrite(outbuf, 1, outlen, fout);
+    if (map != MAP_FAILED) {
+        madvise(map, st.st_size, MADV_SEQUENTIAL);
+        for (off_t off = 0; off < st.st_size; off += buffer_size) {
+            size_t inlen = st.st_size - off < (off_t)buffer_size ? st.st_size - off : buffer_size;
+            if (!EVP_EncryptUpdate(ctx, outbuf, &outlen, map + off, inlen))
+                handleErrors();
+            write_all(fdout, outbuf, outlen);
+            done = off + inlen;
+            if (progress)
+                report_progress(msg, done, total, 0);
+        }
+        munmap(map, st.st_size);
+    } else {
+        unsigned char *inbuf = malloc(buffer_size);
+        if (!inbuf) {
+            perror("Memory error");
+            return 1;
+        }
+        posix_fadvise(fdin, 0, 0, POSIX_FADV_SEQUENTIAL);
+        ssize_t inlen;
+        while ((inlen = read(fdin, inbuf, buffer_size)) != 0) {
+            if (inlen < 0) {
+                if (errno == EINTR)
+                    continue;
+                perror("Read error");
+                return 1;
+            }
+            if (!EVP_EncryptUpdate(ctx, outbuf, &outlen, inbuf, inlen))
+                handleErrors();
+            write_all(fdout, outbuf, outlen);
+            done += inlen;
+            if (progress)
+                report_progress(msg, done, total, 0);
+        }
+        free(inbuf);
     }
 
+    if (progress)
+        report_progress(msg, done, total, 1);
+
     if (!EVP_EncryptFinal_ex(ctx, outbuf, &outlen))
         handleErrors();
-    fwrite(outbuf, 1, outlen, fout);
+    write_all(fdout, outbuf, outlen);
 
     EVP_CIPHER_CTX_free(ctx);
-    fclose(fin);
-    fclose(fout);
+    free(outbuf);
+    close(fdin);
+    if (close(fdout) < 0) {
+        perror("Write error");
+        return 1;
+    }
 
-    printf("Encryption completed!\n");
+    fprintf(msg, "Encryption completed!\n");
     return 0;
 }
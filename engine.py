@@ -0,0 +1,1295 @@
+import os, sys, stat, time, ctypes, ctypes.util, hashlib, hmac, itertools, threading, struct, json, zlib
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# In-process counterpart of output/encryptor and output/decryptor: same
+# PBKDF2-HMAC-SHA256 key derivation and the same salt|iv|ciphertext layout,
+# driven through libcrypto's EVP API with ctypes instead of a fork/exec and a
+# stdin/stdout round-trip per file. ctypes drops the GIL around each call, so
+# several threads can run jobs concurrently.
+
+SALT_SIZE = 16
+IV_SIZE = 16
+KEY_SIZE = 32
+KDF_ITERATIONS = 10000
+BUFFER_SIZE = 1 << 20
+MAX_BUFFER_SIZE = 1 << 30
+BLOCK_SIZE = 16
+PROGRESS_INTERVAL = 0.1
+
+# Files written by the engine's own formats start with MAGIC and a version
+# byte. Legacy files start with a random salt, so an 8-byte magic keeps the
+# chance of misreading one negligible.
+MAGIC = b"\x89ENCRYD\n"
+VERSION_SESSION = 1
+VERSION_SEGMENTED = 2
+
+# Segmented format (version 2): the plaintext is cut into SEGMENT_SIZE pieces
+# that are sealed independently with AES-256-GCM, so both directions can run
+# on every core and still be written out in order.
+#   MAGIC | version | flags | cipher | segment size (u32) | key block | nonce prefix
+#   then per segment: ciphertext | 16-byte tag
+# Segment i uses nonce prefix|u32(i) and authenticates the whole header plus
+# (i, is_last) as AAD, so reordering, truncation and header edits all fail.
+# FLAG_ZLIB / FLAG_ZSTD mean the plaintext was compressed as one stream
+# before being cut into segments; decryption inflates it as it goes.
+# FLAG_HEADER_MAC means the header ends in an HMAC-SHA256 of everything before
+# it under an HKDF-derived key, so a wrong password or an edited header is
+# caught before any segment is read (the MAC is part of the segments' AAD).
+SEGMENT_SIZE = 1 << 20
+NONCE_PREFIX_SIZE = 8
+TAG_SIZE = 16
+HEADER_MAC_SIZE = 32
+FLAG_SESSION = 0x01
+FLAG_ZLIB = 0x02
+FLAG_ZSTD = 0x04
+FLAG_HEADER_MAC = 0x08
+FLAG_CODECS = FLAG_ZLIB | FLAG_ZSTD
+ZLIB_LEVEL = 1
+ZSTD_LEVEL = 3
+# The cipher byte picks the segment sealer: AES-256-GCM, ChaCha20-Poly1305
+# (fast without AES instructions), or AES-256-CTR with a truncated
+# HMAC-SHA256 tag over AAD|nonce|ciphertext under an HKDF-derived MAC key.
+CIPHER_AES_256_GCM = 1
+CIPHER_CHACHA20_POLY1305 = 2
+CIPHER_AES_256_CTR_HMAC = 3
+MODES = {"gcm": CIPHER_AES_256_GCM, "chacha20": CIPHER_CHACHA20_POLY1305, "ctr": CIPHER_AES_256_CTR_HMAC}
+EVP_CTRL_GCM_GET_TAG = 0x10
+EVP_CTRL_GCM_SET_TAG = 0x11
+
+# Pack container (version 3): a whole directory tree in one file. Every file
+# is cut into chunks that are compressed and sealed independently (in
+# parallel), and an encrypted index at the end records each entry's path,
+# metadata and chunk offsets, so one member can be extracted by seeking
+# straight to it.
+#   MAGIC | version | flags | cipher | chunk size (u32) | key block | nonce prefix
+#   then the chunks (ciphertext | tag), file after file
+#   then the sealed index and a trailer: index offset (u64) | index length (u64)
+# Chunks use nonce prefix|u32(counter), counter running over the archive,
+# and authenticate the header plus (entry, chunk, is_last). The index is
+# zlib-compressed JSON sealed under nonce prefix|PACK_INDEX_NONCE with the
+# header and trailer as AAD.
+VERSION_PACK = 3
+PACK_INDEX_NONCE = 0xFFFFFFFF
+PACK_TRAILER = struct.Struct(">QQ")
+
+# Resumable encryption (encrypt_file(resume=True)) keeps a JSON sidecar next
+# to the output recording the source's identity, the header written, a key
+# check value and the last checkpoint: input and output offsets up to which
+# the output is known to be on disk. Checkpoints fall on segment boundaries
+# (segmented formats) or cipher block boundaries (CBC, where the last
+# ciphertext block is the IV to carry on from), so a rerun truncates the
+# output to the checkpoint and continues from there.
+RESUME_SUFFIX = ".encryd-resume"
+CHECKPOINT_INTERVAL = 64 << 20
+
+class EngineError(Exception):
+    pass
+
+class Cancelled(EngineError):
+    pass
+
+_lib = None
+def _crypto():
+    global _lib
+    if _lib is None:
+        name = ctypes.util.find_library("crypto")
+        if not name:
+            raise EngineError("libcrypto not found")
+        lib = ctypes.CDLL(name)
+        vp, cp, ip, i = ctypes.c_void_p, ctypes.c_char_p, ctypes.POINTER(ctypes.c_int), ctypes.c_int
+        lib.EVP_CIPHER_CTX_new.restype = vp
+        lib.EVP_CIPHER_CTX_new.argtypes = []
+        lib.EVP_CIPHER_CTX_free.restype = None
+        lib.EVP_CIPHER_CTX_free.argtypes = [vp]
+        lib.EVP_aes_256_cbc.restype = vp
+        lib.EVP_aes_256_cbc.argtypes = []
+        lib.EVP_aes_256_gcm.restype = vp
+        lib.EVP_aes_256_gcm.argtypes = []
+        lib.EVP_aes_256_ctr.restype = vp
+        lib.EVP_aes_256_ctr.argtypes = []
+        if hasattr(lib, "EVP_chacha20_poly1305"):
+            lib.EVP_chacha20_poly1305.restype = vp
+            lib.EVP_chacha20_poly1305.argtypes = []
+        if hasattr(lib, "OpenSSL_version"):
+            lib.OpenSSL_version.restype = cp
+            lib.OpenSSL_version.argtypes = [i]
+        lib.EVP_CIPHER_CTX_ctrl.restype = i
+        lib.EVP_CIPHER_CTX_ctrl.argtypes = [vp, i, i, vp]
+        lib.EVP_sha256.restype = vp
+        lib.EVP_sha256.argtypes = []
+        for op in ("Encrypt", "Decrypt"):
+            init = getattr(lib, f"EVP_{op}Init_ex")
+            init.restype = i
+            init.argtypes = [vp, vp, vp, cp, cp]
+            update = getattr(lib, f"EVP_{op}Update")
+            update.restype = i
+            update.argtypes = [vp, vp, ip, vp, i]
+            final = getattr(lib, f"EVP_{op}Final_ex")
+            final.restype = i
+            final.argtypes = [vp, vp, ip]
+        lib.PKCS5_PBKDF2_HMAC.restype = i
+        lib.PKCS5_PBKDF2_HMAC.argtypes = [cp, i, cp, i, i, vp, i, cp]
+        lib.RAND_bytes.restype = i
+        lib.RAND_bytes.argtypes = [cp, i]
+        _lib = lib
+    return _lib
+
+def available():
+    try:
+        _crypto()
+        return True
+    except (EngineError, OSError, AttributeError):
+        return False
+
+def tool_password(password):
+    # The C tools read the password with scanf("%255s"): leading blanks are
+    # skipped and it stops at the first whitespace. Mirror that so files are
+    # interchangeable between both paths.
+    words = password.split()
+    return words[0][:255] if words else ""
+
+def parse_size(text):
+    # "4096", "64K", "4M" -> bytes, same rules as the binaries' -b flag
+    text = str(text).strip()
+    scale = {"k": 1 << 10, "m": 1 << 20}.get(text[-1:].lower(), 1)
+    digits = text[:-1] if scale != 1 else text
+    if not digits.isdigit() or not 16 <= int(digits) * scale <= MAX_BUFFER_SIZE:
+        raise ValueError(f"invalid block size {text!r}")
+    return int(digits) * scale
+
+def random_bytes(n):
+    buf = ctypes.create_string_buffer(n)
+    if _crypto().RAND_bytes(buf, n) != 1:
+        raise EngineError("RAND_bytes failed")
+    return buf.raw
+
+def derive_key(password, salt):
+    lib = _crypto()
+    pw = tool_password(password).encode()
+    key = ctypes.create_string_buffer(KEY_SIZE)
+    if not lib.PKCS5_PBKDF2_HMAC(pw, len(pw), salt, len(salt), KDF_ITERATIONS, lib.EVP_sha256(), KEY_SIZE, key):
+        raise EngineError("key derivation failed")
+    return key.raw
+
+def hkdf(key, salt, info, length=KEY_SIZE):
+    prk = hmac.new(salt, key, hashlib.sha256).digest()
+    out, block, i = b"", b"", 1
+    while len(out) < length:
+        block = hmac.new(prk, block + info + bytes([i]), hashlib.sha256).digest()
+        out += block
+        i += 1
+    return out[:length]
+
+def _zero(buf):
+    # Best effort: wipes our copy of the key; the interpreter may still hold
+    # transient copies made while it was in use.
+    ctypes.memset((ctypes.c_char * len(buf)).from_buffer(buf), 0, len(buf))
+
+class KeyCache:
+    # Bounded LRU of PBKDF2 master keys keyed by (password digest, salt).
+    # Keys live in bytearrays that are zeroed when evicted or cleared.
+    def __init__(self, size=64):
+        self.size = size
+        self._keys = OrderedDict()
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+    def _digest(self, password):
+        return hashlib.sha256(tool_password(password).encode()).digest()
+    def get(self, password, salt):
+        ident = (self._digest(password), bytes(salt))
+        with self._lock:
+            key = self._keys.get(ident)
+            if key is not None:
+                self._keys.move_to_end(ident)
+                return bytes(key)
+        key = bytearray(derive_key(password, salt))
+        with self._lock:
+            self._keys[ident] = key
+            self._keys.move_to_end(ident)
+            while len(self._keys) > self.size:
+                _, old = self._keys.popitem(last=False)
+                _zero(old)
+        return bytes(key)
+    def session(self, password):
+        # One master salt per password for the life of the cache, so a batch
+        # under one password pays PBKDF2 once.
+        digest = self._digest(password)
+        with self._lock:
+            salt = self._sessions.get(digest)
+            if salt is None:
+                salt = self._sessions[digest] = random_bytes(SALT_SIZE)
+                while len(self._sessions) > self.size:
+                    self._sessions.popitem(last=False)
+            self._sessions.move_to_end(digest)
+        return salt, self.get(password, salt)
+    def clear(self):
+        with self._lock:
+            for key in self._keys.values():
+                _zero(key)
+            self._keys.clear()
+            self._sessions.clear()
+
+KEY_CACHE = KeyCache()
+
+class _Cipher:
+    def __init__(self, encrypt, key, iv, cipher=None):
+        self.lib = lib = _crypto()
+        op = "Encrypt" if encrypt else "Decrypt"
+        self._update = getattr(lib, f"EVP_{op}Update")
+        self._final = getattr(lib, f"EVP_{op}Final_ex")
+        self.ctx = lib.EVP_CIPHER_CTX_new()
+        if not self.ctx:
+            raise EngineError("EVP_CIPHER_CTX_new failed")
+        if not getattr(lib, f"EVP_{op}Init_ex")(self.ctx, cipher or lib.EVP_aes_256_cbc(), None, key, iv):
+            self.close()
+            raise EngineError(f"EVP_{op}Init_ex failed")
+        self._out = ctypes.create_string_buffer(BUFFER_SIZE + BLOCK_SIZE)
+        self._outlen = ctypes.c_int()
+    def update(self, data):
+        if len(data) + BLOCK_SIZE > len(self._out):
+            self._out = ctypes.create_string_buffer(len(data) + BLOCK_SIZE)
+        src = (ctypes.c_char * len(data)).from_buffer(data) if isinstance(data, bytearray) else data
+        if not self._update(self.ctx, self._out, ctypes.byref(self._outlen), src, len(data)):
+            raise EngineError("cipher update failed")
+        return ctypes.string_at(self._out, self._outlen.value)
+    def final(self):
+        if not self._final(self.ctx, self._out, ctypes.byref(self._outlen)):
+            raise EngineError("bad decrypt (wrong password or corrupt file)")
+        return ctypes.string_at(self._out, self._outlen.value)
+    def close(self):
+        if self.ctx:
+            self.lib.EVP_CIPHER_CTX_free(self.ctx)
+            self.ctx = None
+    def __enter__(self):
+        return self
+    def __exit__(self, *exc):
+        self.close()
+
+def _aead(evp_cipher, encrypt, key, nonce, aad, data):
+    # One-shot AEAD (GCM or ChaCha20-Poly1305) over a single segment. Returns
+    # ciphertext|tag when sealing, plaintext when opening; raises EngineError
+    # on a bad tag.
+    lib = _crypto()
+    op = "Encrypt" if encrypt else "Decrypt"
+    if not encrypt:
+        if len(data) < TAG_SIZE:
+            raise EngineError("truncated segment")
+        data, tag = data[:-TAG_SIZE], data[-TAG_SIZE:]
+    ctx = lib.EVP_CIPHER_CTX_new()
+    if not ctx:
+        raise EngineError("EVP_CIPHER_CTX_new failed")
+    try:
+        outlen = ctypes.c_int()
+        out = ctypes.create_string_buffer(len(data) + TAG_SIZE)
+        if not getattr(lib, f"EVP_{op}Init_ex")(ctx, evp_cipher, None, key, nonce):
+            raise EngineError(f"EVP_{op}Init_ex failed")
+        update = getattr(lib, f"EVP_{op}Update")
+        if not update(ctx, None, ctypes.byref(outlen), aad, len(aad)):
+            raise EngineError("AAD update failed")
+        if data and not update(ctx, out, ctypes.byref(outlen), data, len(data)):
+            raise EngineError("cipher update failed")
+        n = outlen.value if data else 0
+        if not encrypt and not lib.EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_SET_TAG, TAG_SIZE, tag):
+            raise EngineError("setting GCM tag failed")
+        final = ctypes.create_string_buffer(TAG_SIZE)
+        if not getattr(lib, f"EVP_{op}Final_ex")(ctx, final, ctypes.byref(outlen)):
+            raise EngineError("authentication failed (wrong password or corrupt file)")
+        if encrypt:
+            tagbuf = ctypes.create_string_buffer(TAG_SIZE)
+            if not lib.EVP_CIPHER_CTX_ctrl(ctx, EVP_CTRL_GCM_GET_TAG, TAG_SIZE, tagbuf):
+                raise EngineError("reading GCM tag failed")
+            return ctypes.string_at(out, n) + tagbuf.raw
+        return ctypes.string_at(out, n)
+    finally:
+        lib.EVP_CIPHER_CTX_free(ctx)
+
+def _gcm(encrypt, key, nonce, aad, data):
+    return _aead(_crypto().EVP_aes_256_gcm(), encrypt, key, nonce, aad, data)
+
+def _chacha20(encrypt, key, nonce, aad, data):
+    lib = _crypto()
+    if not hasattr(lib, "EVP_chacha20_poly1305"):
+        raise EngineError("this libcrypto has no ChaCha20-Poly1305")
+    return _aead(lib.EVP_chacha20_poly1305(), encrypt, key, nonce, aad, data)
+
+def _ctr_hmac(encrypt, key, nonce, aad, data):
+    # The 12-byte nonce plus a zero block counter is the CTR IV; segments are
+    # far below 2**32 blocks, so the counter never reaches the nonce bytes.
+    lib = _crypto()
+    mac_key = hkdf(key, b"", b"encryd ctr mac")
+    iv = nonce + bytes(IV_SIZE - len(nonce))
+    if not encrypt:
+        if len(data) < TAG_SIZE:
+            raise EngineError("truncated segment")
+        data, tag = data[:-TAG_SIZE], data[-TAG_SIZE:]
+        if not hmac.compare_digest(tag, hmac.new(mac_key, aad + nonce + data, hashlib.sha256).digest()[:TAG_SIZE]):
+            raise EngineError("authentication failed (wrong password or corrupt file)")
+    with _Cipher(encrypt, key, iv, lib.EVP_aes_256_ctr()) as c:
+        out = c.update(data) + c.final()
+    if encrypt:
+        out += hmac.new(mac_key, aad + nonce + out, hashlib.sha256).digest()[:TAG_SIZE]
+    return out
+
+SEALERS = {CIPHER_AES_256_GCM: _gcm, CIPHER_CHACHA20_POLY1305: _chacha20, CIPHER_AES_256_CTR_HMAC: _ctr_hmac}
+
+def cpu_features():
+    # CPU flags that matter for symmetric crypto, as the kernel reports them
+    # (x86 "flags" or ARM "Features" in /proc/cpuinfo). Empty when unknown.
+    wanted = {"aes", "vaes", "pclmulqdq", "vpclmulqdq", "avx2", "avx512f", "sha_ni", "pmull", "sha2"}
+    try:
+        with open("/proc/cpuinfo") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("flags", "Features"):
+                    return sorted(wanted & set(value.split()))
+    except OSError:
+        pass
+    return []
+
+def openssl_version():
+    lib = _crypto()
+    return lib.OpenSSL_version(0).decode() if hasattr(lib, "OpenSSL_version") else "unknown"
+
+def recommended_mode():
+    # GCM where AES runs in hardware, ChaCha20-Poly1305 where it doesn't.
+    if "aes" in cpu_features() or not hasattr(_crypto(), "EVP_chacha20_poly1305"):
+        return "gcm"
+    return "chacha20"
+
+def probe(size=16 << 20):
+    # Single-thread throughput (MB/s) of each mode over size bytes in
+    # SEGMENT_SIZE pieces, plus what the CPU and libcrypto report.
+    key, nonce = random_bytes(KEY_SIZE), random_bytes(12)
+    block = random_bytes(min(size, SEGMENT_SIZE))
+    rounds = max(size // len(block), 1)
+    results = {}
+    def timed(func):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            func()
+        return rounds * len(block) / (time.perf_counter() - start) / 1e6
+    def cbc(encrypt):
+        data = block if encrypt else sealed_cbc
+        with _Cipher(encrypt, key, nonce + bytes(4)) as c:
+            c.update(data)
+            c.final()
+    with _Cipher(True, key, nonce + bytes(4)) as c:
+        sealed_cbc = c.update(block) + c.final()
+    results["cbc-encrypt"] = timed(lambda: cbc(True))
+    results["cbc-decrypt"] = timed(lambda: cbc(False))
+    for mode, cipher in MODES.items():
+        try:
+            results[mode] = timed(lambda: SEALERS[cipher](True, key, nonce, b"", block))
+        except EngineError:
+            pass
+    return {
+        "cpu_features": cpu_features(),
+        "aes_hardware": "aes" in cpu_features(),
+        "openssl": openssl_version(),
+        "throughput_mb_s": results,
+        "recommended": recommended_mode(),
+    }
+
+def _cleanup(path):
+    # Removes a partial output. Only ever a regular file: a FIFO or device
+    # given as the output (say /dev/null, when run as root) stays.
+    try:
+        if stat.S_ISREG(os.stat(path).st_mode):
+            os.remove(path)
+    except OSError:
+        pass
+
+def _read_exact(fin, n):
+    data = fin.read(n)
+    if len(data) != n:
+        raise EngineError("file too short to be encrypted")
+    return data
+
+def _new_key(password, session):
+    # Returns (flags, key block to store in the header, key).
+    if session:
+        master_salt, master = KEY_CACHE.session(password)
+        salt = random_bytes(SALT_SIZE)
+        return FLAG_SESSION, master_salt + salt, hkdf(master, salt, b"encryd file key")
+    salt = random_bytes(SALT_SIZE)
+    return 0, salt, derive_key(password, salt)
+
+def _read_key(password, flags, fin):
+    if flags & FLAG_SESSION:
+        master_salt = _read_exact(fin, SALT_SIZE)
+        salt = _read_exact(fin, SALT_SIZE)
+        master = KEY_CACHE.get(password, master_salt)
+        return master_salt + salt, hkdf(master, salt, b"encryd file key")
+    salt = _read_exact(fin, SALT_SIZE)
+    return salt, derive_key(password, salt)
+
+class _IterReader:
+    # File-like read(n) over an iterator of byte chunks, so the header and
+    # segment parsing below works the same on files and on streams.
+    def __init__(self, chunks):
+        self._it = iter(chunks)
+        self._buf = bytearray()
+    def read(self, n):
+        while len(self._buf) < n:
+            chunk = next(self._it, None)
+            if chunk is None:
+                break
+            if not self._buf and len(chunk) == n:
+                return bytes(chunk)
+            self._buf += chunk
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+    def rest(self):
+        if self._buf:
+            data, self._buf = bytes(self._buf), bytearray()
+            yield data
+        yield from self._it
+
+def _file_chunks(fin, size=BUFFER_SIZE):
+    return iter(lambda: fin.read(size), b"")
+
+def _segments(fin, size, index=0):
+    # Yields (index, data, is_last) with one segment of lookahead so the last
+    # one is known; an empty input still yields one (empty, last) segment.
+    data = fin.read(size)
+    while True:
+        ahead = fin.read(size) if len(data) == size else b""
+        yield index, data, not ahead
+        if not ahead:
+            return
+        index += 1
+        data = ahead
+
+def _ordered_map(func, items, threads):
+    # Runs func over items on a thread pool, yielding results in input order
+    # with at most 2 * threads items in flight.
+    threads = threads or os.cpu_count() or 1
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        pending = deque()
+        for item in items:
+            pending.append(pool.submit(func, *item))
+            if len(pending) >= threads * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def _segment_aad(header, index, last):
+    return header + struct.pack(">QB", index, last)
+
+def _segment_nonce(prefix, index):
+    return prefix + struct.pack(">I", index)
+
+def _codec_flag(compress):
+    # "zlib", "zstd", or "auto"/True for zstd when the zstandard module is
+    # installed and zlib otherwise.
+    if compress in ("auto", True):
+        compress = "zstd" if zstandard else "zlib"
+    if compress == "zstd" and not zstandard:
+        raise EngineError("zstd compression needs the zstandard module")
+    if compress not in ("zlib", "zstd"):
+        raise EngineError(f"unknown compression {compress}")
+    return FLAG_ZSTD if compress == "zstd" else FLAG_ZLIB
+
+def _compressor(flags):
+    if flags & FLAG_ZSTD:
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compressobj()
+    return zlib.compressobj(ZLIB_LEVEL)
+
+def _inflate(flags, pieces):
+    # Decompresses an iterable of pieces into chunks of at most BUFFER_SIZE,
+    # so a segment of highly compressible (or crafted) data never expands
+    # into one huge piece.
+    if flags & FLAG_ZSTD:
+        if not zstandard:
+            raise EngineError("file is zstd-compressed; install the zstandard module")
+        reader = zstandard.ZstdDecompressor().stream_reader(_IterReader(pieces))
+        yield from iter(lambda: reader.read(BUFFER_SIZE), b"")
+        return
+    dec = zlib.decompressobj()
+    for data in pieces:
+        while True:
+            out = dec.decompress(data, BUFFER_SIZE)
+            data = dec.unconsumed_tail
+            if out:
+                yield out
+            # a full buffer may leave output pending inside zlib
+            if not data and len(out) < BUFFER_SIZE:
+                break
+    yield dec.flush()
+
+class _CompressReader:
+    # read(n) over the compressed form of fin, so compression slots in front
+    # of _segments without changing the segment layout.
+    def __init__(self, fin, comp):
+        self._fin = fin
+        self._comp = comp
+        self._buf = bytearray()
+        self._eof = False
+    def read(self, n):
+        while len(self._buf) < n and not self._eof:
+            data = self._fin.read(BUFFER_SIZE)
+            if data:
+                self._buf += self._comp.compress(data)
+            else:
+                self._buf += self._comp.flush()
+                self._eof = True
+        data = bytes(self._buf[:n])
+        del self._buf[:n]
+        return data
+
+def _header_mac(key, header):
+    return hmac.new(hkdf(key, b"", b"encryd header mac"), header, hashlib.sha256).digest()
+
+def _segmented_header(flags, cipher, seg_size, key_block, prefix, key=None):
+    header = (MAGIC + bytes([VERSION_SEGMENTED, flags, cipher])
+              + struct.pack(">I", seg_size) + key_block + prefix)
+    return header + _header_mac(key, header) if flags & FLAG_HEADER_MAC else header
+
+def _read_segmented_header(fin, password):
+    # Reads the rest of a version 2 header (after MAGIC and the version byte).
+    # Returns (header, flags, cipher, segment size, key, nonce prefix).
+    flags, cipher = _read_exact(fin, 2)
+    if cipher not in SEALERS:
+        raise EngineError(f"unsupported cipher {cipher}")
+    if flags & ~(FLAG_SESSION | FLAG_CODECS | FLAG_HEADER_MAC):
+        raise EngineError(f"unsupported flags {flags:#x}")
+    seg_size = struct.unpack(">I", _read_exact(fin, 4))[0]
+    key_block, key = _read_key(password, flags, fin)
+    prefix = _read_exact(fin, NONCE_PREFIX_SIZE)
+    header = _segmented_header(flags, cipher, seg_size, key_block, prefix, key)
+    if flags & FLAG_HEADER_MAC:
+        if not hmac.compare_digest(_read_exact(fin, HEADER_MAC_SIZE), header[-HEADER_MAC_SIZE:]):
+            raise EngineError("wrong password or corrupted header")
+    return header, flags, cipher, seg_size, key, prefix
+
+def _check_cipher(cipher):
+    if cipher == CIPHER_CHACHA20_POLY1305 and not hasattr(_crypto(), "EVP_chacha20_poly1305"):
+        raise EngineError("this libcrypto has no ChaCha20-Poly1305")
+
+def _encrypt_segmented(fin, password, session, threads, compress=None, cipher=CIPHER_AES_256_GCM):
+    _check_cipher(cipher)
+    flags, key_block, key = _new_key(password, session)
+    flags |= FLAG_HEADER_MAC
+    if compress:
+        flags |= _codec_flag(compress)
+        fin = _CompressReader(fin, _compressor(flags))
+    prefix = random_bytes(NONCE_PREFIX_SIZE)
+    header = _segmented_header(flags, cipher, SEGMENT_SIZE, key_block, prefix, key)
+    yield header
+    sealer = SEALERS[cipher]
+    seal = lambda i, data, last: sealer(True, key, _segment_nonce(prefix, i), _segment_aad(header, i, last), data)
+    yield from _ordered_map(seal, _segments(fin, SEGMENT_SIZE), threads)
+
+def _segment_tail_check(f, seg_size, open_):
+    # Checks that the segment sizes of the seekable file f (positioned just
+    # after the header) add up and opens the last segment, whose tag covers
+    # the header and its own index, so a truncated or cut file fails before
+    # anything is written. Leaves f where it was; returns the segment count.
+    pos = f.tell()
+    stride = seg_size + TAG_SIZE
+    body = f.seek(0, os.SEEK_END) - pos
+    count = max(1, -(-body // stride))
+    if body - (count - 1) * stride < TAG_SIZE:
+        raise EngineError("truncated or corrupt file (segment sizes don't add up)")
+    f.seek(pos + (count - 1) * stride)
+    open_(count - 1, f.read(), True)
+    f.seek(pos)
+    return count
+
+def _decrypt_segmented(fin, password, threads, tail=None):
+    header, flags, cipher, seg_size, key, prefix = _read_segmented_header(fin, password)
+    sealer = SEALERS[cipher]
+    open_ = lambda i, blob, last: sealer(False, key, _segment_nonce(prefix, i), _segment_aad(header, i, last), blob)
+    if tail is not None:
+        _segment_tail_check(tail, seg_size, open_)
+    plain = _ordered_map(open_, _segments(fin, seg_size + TAG_SIZE), threads)
+    if not flags & FLAG_CODECS:
+        yield from plain
+        return
+    yield from _inflate(flags, plain)
+
+def _encrypt(fin, chunks, password, session, mode, threads, compress=None):
+    if mode == "auto":
+        mode = recommended_mode()
+    if mode in MODES or compress:
+        cipher = MODES.get(mode, CIPHER_AES_256_GCM)
+        yield from _encrypt_segmented(fin, password, session, threads, compress, cipher)
+        return
+    if mode != "cbc":
+        raise EngineError(f"unknown mode {mode}")
+    flags, key_block, key = _new_key(password, session)
+    iv = random_bytes(IV_SIZE)
+    yield (MAGIC + bytes([VERSION_SESSION]) if session else b"") + key_block + iv
+    with _Cipher(True, key, iv) as c:
+        for chunk in chunks:
+            yield c.update(chunk)
+        yield c.final()
+
+def _cbc_key(fin, head, password):
+    # Key and IV of a CBC file: the C tools' salt | iv, or version 1 when head
+    # is MAGIC (and the version byte has been read).
+    if head == MAGIC:
+        _, key = _read_key(password, FLAG_SESSION, fin)
+    else:
+        salt = head + _read_exact(fin, SALT_SIZE - len(head))
+        key = derive_key(password, salt)
+    return key, _read_exact(fin, IV_SIZE)
+
+def _cbc_precheck(f, key):
+    # Decrypts only the last block of the seekable CBC file f (positioned
+    # just after the IV) and checks its padding, so a wrong password or a
+    # cut-off file fails before anything is written. There is no MAC: about
+    # one wrong password in 256 still gets past, to fail at the end as before.
+    pos = f.tell()
+    end = f.seek(0, os.SEEK_END)
+    if end - pos < BLOCK_SIZE or (end - pos) % BLOCK_SIZE:
+        raise EngineError("truncated or corrupt file (not a whole number of cipher blocks)")
+    # the block before the last one is its IV (the header's IV if it's the only one)
+    f.seek(end - 2 * BLOCK_SIZE)
+    prev, last = f.read(BLOCK_SIZE), f.read(BLOCK_SIZE)
+    f.seek(pos)
+    with _Cipher(False, key, prev) as c:
+        c.update(last)
+        c.final()
+
+def _decrypt(fin, chunks, password, threads, tail=None):
+    # Picks the format from the header; anything without MAGIC is a file
+    # from the C encryptor. tail, the underlying file when it is seekable,
+    # lets the end of the file (CBC padding, last segment) be checked first.
+    head = fin.read(len(MAGIC))
+    if head == MAGIC:
+        version = _read_exact(fin, 1)[0]
+        if version == VERSION_SEGMENTED:
+            yield from _decrypt_segmented(fin, password, threads, tail)
+            return
+        if version == VERSION_PACK:
+            raise EngineError("this is a pack container; extract it with unpack")
+        if version != VERSION_SESSION:
+            raise EngineError(f"unsupported format version {version}")
+    key, iv = _cbc_key(fin, head, password)
+    if tail is not None:
+        _cbc_precheck(tail, key)
+    with _Cipher(False, key, iv) as c:
+        for chunk in chunks():
+            yield c.update(chunk)
+        yield c.final()
+
+def encrypt_stream(chunks, password, session=False, mode="cbc", threads=None, compress=None):
+    # Generator API: encrypts an iterable of byte chunks and yields the
+    # ciphertext piece by piece, holding at most a few buffers in memory.
+    # Output is byte-identical in layout to encrypt_file.
+    reader = _IterReader(chunks)
+    yield from _encrypt(reader, reader.rest(), password, session, mode, threads, compress)
+
+def decrypt_stream(chunks, password, threads=None):
+    # Inverse of encrypt_stream; accepts any of the formats decrypt_file does.
+    reader = _IterReader(chunks)
+    yield from _decrypt(reader, reader.rest, password, threads)
+
+def _write_or_remove(dst, pieces):
+    # Returns the number of bytes written. dst is only opened once the first
+    # piece is ready, so a bad header or password leaves an existing file
+    # untouched.
+    pieces = iter(pieces)
+    pieces = itertools.chain([next(pieces, b"")], pieces)
+    written = 0
+    if dst == "-":
+        out = sys.stdout.buffer
+        for piece in pieces:
+            out.write(piece)
+            written += len(piece)
+        out.flush()
+        return written
+    with open(dst, "wb") as fout:
+        try:
+            for piece in pieces:
+                fout.write(piece)
+                written += len(piece)
+        except BaseException:
+            regular = stat.S_ISREG(os.fstat(fout.fileno()).st_mode)
+            fout.close()
+            if regular:
+                _cleanup(dst)
+            raise
+    return written
+
+class _ProgressReader:
+    # Wraps an input file and reports (bytes read, total) to callback at most
+    # once per PROGRESS_INTERVAL, like the binaries' -g records. With no
+    # callback it only counts.
+    def __init__(self, fin, callback, total):
+        self._fin = fin
+        self.callback = callback
+        self.total = total
+        self.done = 0
+        self._last = 0.0
+    def read(self, n=-1):
+        data = self._fin.read(n)
+        self.done += len(data)
+        now = time.monotonic()
+        if self.callback and now - self._last >= PROGRESS_INTERVAL:
+            self._last = now
+            self.callback(self.done, self.total)
+        return data
+    def finish(self):
+        if self.callback:
+            self.callback(self.done, self.total)
+
+def _input_size(fin):
+    st = os.fstat(fin.fileno())
+    return st.st_size if stat.S_ISREG(st.st_mode) else 0
+
+def _open_input(src):
+    return open(sys.stdin.fileno(), "rb", closefd=False) if src == "-" else open(src, "rb")
+
+def resume_path(dst):
+    return dst + RESUME_SUFFIX
+
+def _source_id(src):
+    st = os.stat(src)
+    return {"source": os.path.abspath(src), "size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def _key_check(key):
+    # Lets a resumed run reject a wrong password without storing anything
+    # that helps recover the key.
+    return hkdf(key, b"", b"encryd resume check", 16).hex()
+
+def _load_checkpoint(src, dst):
+    # The sidecar state for dst if it was written for this source (same path,
+    # size and mtime) and dst still starts with the recorded header.
+    try:
+        with open(resume_path(dst)) as f:
+            state = json.load(f)
+        if state.get("version") != 1 or any(state.get(k) != v for k, v in _source_id(src).items()):
+            return None
+        header = bytes.fromhex(state["header"])
+        with open(dst, "rb") as f:
+            if f.read(len(header)) != header or os.fstat(f.fileno()).st_size < state["out"]:
+                return None
+        return state
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def resume_offset(src, dst):
+    # Input bytes an interrupted resume=True run has already encrypted from
+    # src into dst, or None when there is nothing to resume.
+    if src == "-" or dst == "-":
+        return None
+    state = _load_checkpoint(src, dst)
+    return state["in"] if state else None
+
+def _fsync_dir(path):
+    if os.name != 'nt':
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+def _save_checkpoint(fout, dst, state):
+    # Output data first, then the sidecar via write-fsync-rename, so a
+    # checkpoint never points past what is on disk.
+    fout.flush()
+    os.fsync(fout.fileno())
+    side = resume_path(dst)
+    tmp = side + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(state, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, side)
+    _fsync_dir(side)
+
+def _cbc_pieces(fin, key, iv, buffer_size, done):
+    # Yields (ciphertext, input offset it completes or None). Encryption
+    # emits every full block, so at block-aligned offsets the output holds
+    # exactly the input so far and its last block is the next IV.
+    with _Cipher(True, key, iv) as c:
+        for chunk in _file_chunks(fin, buffer_size):
+            done += len(chunk)
+            yield c.update(chunk), (None if done % BLOCK_SIZE else done)
+        yield c.final(), None
+
+def _segment_pieces(fin, key, header, cipher, prefix, seg_size, start, threads):
+    sealer = SEALERS[cipher]
+    def seal(i, data, last):
+        sealed = sealer(True, key, _segment_nonce(prefix, i), _segment_aad(header, i, last), data)
+        return sealed, (None if last else (i + 1) * seg_size)
+    return _ordered_map(seal, _segments(fin, seg_size, start), threads)
+
+def _new_resumable(src, password, session, mode):
+    # Header and key for a fresh resumable run; same layouts as _encrypt.
+    if mode == "cbc":
+        flags, key_block, key = _new_key(password, session)
+        header = (MAGIC + bytes([VERSION_SESSION]) if session else b"") + key_block + random_bytes(IV_SIZE)
+    elif mode in MODES:
+        _check_cipher(MODES[mode])
+        flags, key_block, key = _new_key(password, session)
+        flags |= FLAG_HEADER_MAC
+        header = _segmented_header(flags, MODES[mode], SEGMENT_SIZE, key_block, random_bytes(NONCE_PREFIX_SIZE), key)
+    else:
+        raise EngineError(f"unknown mode {mode}")
+    state = dict(_source_id(src), version=1, mode=mode, header=header.hex(), check=_key_check(key))
+    state.update({"in": 0, "out": len(header)})
+    return state, key
+
+def _resumed_key(state, password):
+    header = bytes.fromhex(state["header"])
+    fin = _IterReader([header[len(MAGIC) + 1:]] if header.startswith(MAGIC) else [header])
+    if state["mode"] == "cbc":
+        _, key = _read_key(password, FLAG_SESSION if header.startswith(MAGIC) else 0, fin)
+    else:
+        key = _read_segmented_header(fin, password)[4]
+    if not hmac.compare_digest(_key_check(key), state["check"]):
+        raise EngineError("wrong password for the saved checkpoint")
+    return key
+
+def _encrypt_resumable(src, dst, password, session, mode, threads, buffer_size, progress):
+    # encrypt_file with checkpoints: every CHECKPOINT_INTERVAL input bytes the
+    # output is fsynced and the sidecar updated. If a matching sidecar exists
+    # the output is cut back to its checkpoint and encryption continues from
+    # there with the recorded header and mode (the password must match).
+    # Compression is not supported: a compressor's state can't be saved.
+    if src == "-" or dst == "-":
+        raise EngineError("resume needs files, not stdin/stdout")
+    state = _load_checkpoint(src, dst)
+    if state:
+        key = _resumed_key(state, password)
+        fout = open(dst, "r+b")
+    else:
+        state, key = _new_resumable(src, password, session, recommended_mode() if mode == "auto" else mode)
+        fout = open(dst, "w+b")
+    header = bytes.fromhex(state["header"])
+    with open(src, "rb") as f, fout:
+        try:
+            if state["out"] == len(header):
+                fout.write(header)
+            # the block before the checkpoint is the CBC IV (the header's own
+            # IV at the start); anything after the checkpoint is discarded
+            fout.seek(state["out"] - BLOCK_SIZE)
+            iv = fout.read(BLOCK_SIZE)
+            fout.truncate(state["out"])
+            fout.seek(state["out"])
+            f.seek(state["in"])
+            fin = _ProgressReader(f, progress, state["size"])
+            fin.done = state["in"]
+            if state["mode"] == "cbc":
+                pieces = _cbc_pieces(fin, key, iv, buffer_size, state["in"])
+            else:
+                flags, cipher = header[len(MAGIC) + 1:len(MAGIC) + 3]
+                seg_size = struct.unpack_from(">I", header, len(MAGIC) + 3)[0]
+                start = len(MAGIC) + 7 + SALT_SIZE * (2 if flags & FLAG_SESSION else 1)
+                prefix = header[start:start + NONCE_PREFIX_SIZE]
+                pieces = _segment_pieces(fin, key, header, cipher, prefix, seg_size,
+                                         state["in"] // seg_size, threads)
+            last = state["in"]
+            for data, done in pieces:
+                fout.write(data)
+                state["out"] += len(data)
+                if done is not None and done - last >= CHECKPOINT_INTERVAL:
+                    state["in"] = last = done
+                    _save_checkpoint(fout, dst, state)
+            fin.finish()
+        except BaseException:
+            if not os.path.exists(resume_path(dst)):
+                fout.close()
+                _cleanup(dst)
+            raise
+    _cleanup(resume_path(dst))
+    return fin.done, state["out"]
+
+def encrypt_file(src, dst, password, session=False, mode="cbc", threads=None, buffer_size=BUFFER_SIZE, progress=None,
+                 compress=None, resume=False):
+    # mode="cbc" keeps the binaries' layout (salt | iv | ciphertext), or with
+    # session=True the versioned session-key layout where PBKDF2 runs once per
+    # password (cached in KEY_CACHE) and each file gets an HKDF subkey:
+    #   MAGIC | version | master salt | file salt | iv | ciphertext
+    # mode="gcm", "ctr" or "chacha20" writes the parallel segmented format
+    # (version 2) with that cipher recorded in the header; "auto" picks GCM
+    # or ChaCha20-Poly1305 by CPU (see recommended_mode). compress ("zlib", "zstd" or "auto") compresses before encrypting and
+    # always uses the segmented format, whose header records the codec.
+    # "-" as src/dst means stdin/stdout. progress(done, total) is called with
+    # input bytes consumed, throttled to PROGRESS_INTERVAL. resume=True
+    # checkpoints the output so an interrupted run continues where it stopped
+    # (see _encrypt_resumable). Returns (bytes read, bytes written).
+    if resume:
+        if compress:
+            raise EngineError("resumable encryption can't be combined with compression")
+        return _encrypt_resumable(src, dst, password, session, mode, threads, buffer_size, progress)
+    if dst != "-":
+        _cleanup(resume_path(dst))  # a checkpoint for an output being replaced
+    with _open_input(src) as f:
+        fin = _ProgressReader(f, progress, _input_size(f))
+        chunks = _file_chunks(fin, buffer_size)
+        written = _write_or_remove(dst, _encrypt(fin, chunks, password, session, mode, threads, compress))
+        fin.finish()
+        return fin.done, written
+
+def decrypt_file(src, dst, password, threads=None, buffer_size=BUFFER_SIZE, progress=None):
+    with _open_input(src) as f:
+        size = _input_size(f)
+        fin = _ProgressReader(f, progress, size) if progress else f
+        _write_or_remove(dst, _decrypt(fin, lambda: _file_chunks(fin, buffer_size), password, threads,
+                                       f if size else None))
+        if progress:
+            fin.finish()
+
+def _pack_header(flags, chunk_size, key_block, prefix):
+    return (MAGIC + bytes([VERSION_PACK, flags, CIPHER_AES_256_GCM])
+            + struct.pack(">I", chunk_size) + key_block + prefix)
+
+def _pack_aad(header, entry, chunk, last):
+    return header + struct.pack(">QQB", entry, chunk, last)
+
+def _scan_tree(root):
+    # Index entries for everything below root, parents before children.
+    # Symlinks are stored as links and not followed.
+    entries = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in dirnames + sorted(filenames):
+            full = os.path.join(dirpath, name)
+            st = os.lstat(full)
+            entry = {"path": os.path.relpath(full, root).replace(os.sep, "/"),
+                     "mode": stat.S_IMODE(st.st_mode), "mtime": st.st_mtime}
+            if stat.S_ISLNK(st.st_mode):
+                entry.update(type="link", target=os.readlink(full))
+            elif stat.S_ISDIR(st.st_mode):
+                entry["type"] = "dir"
+            elif stat.S_ISREG(st.st_mode):
+                entry.update(type="file", size=st.st_size)
+            else:
+                continue
+            entries.append((full, entry))
+    return entries
+
+def _pack_chunks(entries, chunk_size):
+    # (entry no, chunk no, source path, offset, nonce counter, is_last) for
+    # every chunk of every regular file, numbering nonces as it goes.
+    counter = 0
+    for no, (full, entry) in enumerate(entries):
+        if entry["type"] != "file":
+            continue
+        count = (entry["size"] + chunk_size - 1) // chunk_size
+        entry["first"] = counter
+        for i in range(count):
+            if counter >= PACK_INDEX_NONCE:
+                raise EngineError("too many chunks for one container")
+            yield no, i, full, i * chunk_size, counter, i == count - 1
+            counter += 1
+
+def _pack(src, password, session, compress, threads, chunk_size, progress):
+    if not os.path.isdir(src):
+        raise EngineError(f"{src} is not a directory")
+    entries = _scan_tree(src)
+    flags, key_block, key = _new_key(password, session)
+    prefix = random_bytes(NONCE_PREFIX_SIZE)
+    header = _pack_header(flags, chunk_size, key_block, prefix)
+    total = sum(e.get("size", 0) for _, e in entries)
+    done, last_report = 0, 0.0
+
+    def seal(no, i, full, offset, counter, last):
+        with open(full, "rb") as f:
+            f.seek(offset)
+            data = f.read(chunk_size)
+        packed = zlib.compress(data) if compress else data
+        z = len(packed) < len(data)
+        blob = _gcm(True, key, _segment_nonce(prefix, counter), _pack_aad(header, no, i, last),
+                    packed if z else data)
+        return no, len(data), blob, z
+
+    yield header
+    pos = len(header)
+    for _, entry in entries:
+        if entry["type"] == "file":
+            entry.update(offset=pos, chunks=[])
+    # sizes are re-counted from what was read, in case a file shrank
+    sizes = [0] * len(entries)
+    for no, raw, blob, z in _ordered_map(seal, _pack_chunks(entries, chunk_size), threads):
+        entry = entries[no][1]
+        if not entry["chunks"]:
+            entry["offset"] = pos
+        entry["chunks"].append([len(blob), int(z)])
+        sizes[no] += raw
+        pos += len(blob)
+        done += raw
+        yield blob
+        now = time.monotonic()
+        if progress and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress(done, total)
+    for no, (_, entry) in enumerate(entries):
+        if entry["type"] == "file":
+            entry["size"] = sizes[no]
+    index = zlib.compress(json.dumps([e for _, e in entries], separators=(",", ":")).encode())
+    trailer = PACK_TRAILER.pack(pos, len(index) + TAG_SIZE)
+    yield _gcm(True, key, _segment_nonce(prefix, PACK_INDEX_NONCE), header + trailer, index)
+    yield trailer
+    if progress:
+        progress(total, total)
+
+def pack_dir(src, dst, password, session=False, compress=True, threads=None, buffer_size=BUFFER_SIZE, progress=None):
+    # Packs the directory tree src into one container (format version 3);
+    # buffer_size is the chunk size. "-" as dst writes to stdout, but
+    # extraction needs a seekable file.
+    _write_or_remove(dst, _pack(src, password, session, compress, threads, buffer_size, progress))
+
+def is_pack(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read(len(MAGIC) + 1) == MAGIC + bytes([VERSION_PACK])
+    except OSError:
+        return False
+
+def _open_pack(fin, password):
+    # Reads header, trailer and index: O(index), independent of archive size.
+    if fin.read(len(MAGIC)) != MAGIC or _read_exact(fin, 1)[0] != VERSION_PACK:
+        raise EngineError("not a pack container")
+    flags, cipher = _read_exact(fin, 2)
+    if cipher != CIPHER_AES_256_GCM:
+        raise EngineError(f"unsupported cipher {cipher}")
+    chunk_size = struct.unpack(">I", _read_exact(fin, 4))[0]
+    key_block, key = _read_key(password, flags, fin)
+    prefix = _read_exact(fin, NONCE_PREFIX_SIZE)
+    header = _pack_header(flags, chunk_size, key_block, prefix)
+    end = fin.seek(0, os.SEEK_END)
+    if end < len(header) + PACK_TRAILER.size:
+        raise EngineError("truncated container")
+    fin.seek(end - PACK_TRAILER.size)
+    trailer = fin.read(PACK_TRAILER.size)
+    offset, length = PACK_TRAILER.unpack(trailer)
+    if offset < len(header) or offset + length + PACK_TRAILER.size != end:
+        raise EngineError("truncated or corrupt container")
+    fin.seek(offset)
+    blob = _read_exact(fin, length)
+    index = json.loads(zlib.decompress(_gcm(False, key, _segment_nonce(prefix, PACK_INDEX_NONCE), header + trailer, blob)))
+    return header, key, prefix, index
+
+def pack_index(src, password):
+    # The entries of a container: path, type, mode, mtime and, for files,
+    # size and chunk layout.
+    with open(src, "rb") as fin:
+        return _open_pack(fin, password)[3]
+
+def _member_path(root, rel):
+    # Refuses absolute paths, "..", and paths that resolve outside root
+    # through a symlink extracted earlier.
+    parts = rel.split("/")
+    if not rel or rel.startswith("/") or any(p in ("", ".", "..") for p in parts):
+        raise EngineError(f"unsafe path in container: {rel!r}")
+    path = os.path.join(root, *parts)
+    base = os.path.realpath(root)
+    if os.path.commonpath([base, os.path.realpath(os.path.dirname(path))]) != base:
+        raise EngineError(f"unsafe path in container: {rel!r}")
+    return path
+
+def _pack_blobs(fin, files):
+    # Yields the sealed chunks of the (entry number, entry) pairs in files as
+    # (entry number, chunk number, blob, compressed, counter, is_last).
+    for no, entry in files:
+        fin.seek(entry["offset"])
+        count = len(entry["chunks"])
+        for i, (length, z) in enumerate(entry["chunks"]):
+            yield no, i, _read_exact(fin, length), z, entry["first"] + i, i == count - 1
+
+def _selected(entry, members):
+    return members is None or any(entry["path"] == m or entry["path"].startswith(m.rstrip("/") + "/") for m in members)
+
+def unpack_dir(src, dst, password, members=None, threads=None, buffer_size=BUFFER_SIZE, progress=None):
+    # Extracts the container src below dst; members limits it to those paths
+    # (a directory path selects everything under it). Only the chunks of the
+    # selected files are read.
+    with open(src, "rb") as fin:
+        header, key, prefix, index = _open_pack(fin, password)
+        chosen = [(no, e) for no, e in enumerate(index) if _selected(e, members)]
+        if members is not None and not chosen:
+            raise EngineError("no such member: " + ", ".join(members))
+        os.makedirs(dst, exist_ok=True)
+        files = []
+        for no, entry in chosen:
+            path = _member_path(dst, entry["path"])
+            # a dir or file entry must never land on a symlink (already in dst
+            # or from an earlier link entry): writes and chmod would follow it
+            if entry["type"] != "link" and os.path.islink(path):
+                raise EngineError(f"unsafe path in container: {entry['path']!r}")
+            if entry["type"] == "dir":
+                os.makedirs(path, exist_ok=True)
+            elif entry["type"] == "link":
+                if not os.path.lexists(path):
+                    os.symlink(entry["target"], path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                files.append((no, entry, path))
+        total = sum(e["size"] for _, e, _ in files)
+        done, last_report = 0, 0.0
+
+        def open_(no, i, blob, z, counter, last):
+            data = _gcm(False, key, _segment_nonce(prefix, counter), _pack_aad(header, no, i, last), blob)
+            return zlib.decompress(data) if z else data
+
+        results = _ordered_map(open_, _pack_blobs(fin, [(no, e) for no, e, _ in files]), threads)
+        for no, entry, path in files:
+            _write_or_remove(path, (next(results) for _ in entry["chunks"]))
+            done += entry["size"]
+            now = time.monotonic()
+            if progress and now - last_report >= PROGRESS_INTERVAL:
+                last_report = now
+                progress(done, total)
+        for no, entry in reversed(chosen):
+            if entry["type"] == "link":
+                continue
+            path = _member_path(dst, entry["path"])
+            if os.path.islink(path):
+                continue  # chmod/utime would apply to the link's target
+            os.chmod(path, entry["mode"])
+            os.utime(path, (entry["mtime"], entry["mtime"]))
+        if progress:
+            progress(total, total)
+
+def _verify_segmented(fin, size, password, full, threads, progress):
+    header, flags, cipher, seg_size, key, prefix = _read_segmented_header(fin, password)
+    sealer = SEALERS[cipher]
+    open_ = lambda i, blob, last: sealer(False, key, _segment_nonce(prefix, i), _segment_aad(header, i, last), blob)
+    count = _segment_tail_check(fin, seg_size, open_)
+    name = {v: k for k, v in MODES.items()}[cipher].upper()
+    checked = "header MAC, " if flags & FLAG_HEADER_MAC else ""
+    if not full:
+        return f"{name}, {count} segment(s): {checked}size and last segment OK (quick check)"
+    reader = _ProgressReader(fin, progress, size)
+    reader.done = fin.tell()
+    for _ in _ordered_map(open_, _segments(reader, seg_size + TAG_SIZE), threads):
+        pass
+    reader.finish()
+    return f"{name}, {count} segment(s): {checked}all segments authenticated"
+
+def _verify_pack(fin, password, full, threads, progress):
+    header, key, prefix, index = _open_pack(fin, password)
+    files = [(no, e) for no, e in enumerate(index) if e["type"] == "file"]
+    if not full:
+        return f"container, {len(index)} entries: index authenticated (quick check)"
+    open_ = lambda no, i, blob, z, counter, last: _gcm(False, key, _segment_nonce(prefix, counter),
+                                                        _pack_aad(header, no, i, last), blob)
+    results = _ordered_map(open_, _pack_blobs(fin, files), threads)
+    total = sum(e["size"] for _, e in files)
+    done, last_report = 0, 0.0
+    for _, entry in files:
+        for _ in entry["chunks"]:
+            next(results)
+        done += entry["size"]
+        now = time.monotonic()
+        if progress and now - last_report >= PROGRESS_INTERVAL:
+            last_report = now
+            progress(done, total)
+    if progress:
+        progress(total, total)
+    return f"container, {len(index)} entries: index and all chunks authenticated"
+
+def verify_file(src, password, full=False, threads=None, buffer_size=BUFFER_SIZE, progress=None):
+    # Checks that src decrypts under password without writing anything, and
+    # returns a one-line summary; raises EngineError on any mismatch. The
+    # quick check reads a few blocks whatever the file size: for the
+    # segmented format the header MAC, the segment size arithmetic and the
+    # last segment's tag; for containers the sealed index; for CBC files,
+    # which have no MAC, the last block's padding. full=True authenticates
+    # every segment or chunk on all cores (CBC: decrypts everything).
+    with open(src, "rb") as fin:
+        size = os.fstat(fin.fileno()).st_size
+        head = fin.read(len(MAGIC))
+        version = _read_exact(fin, 1)[0] if head == MAGIC else None
+        if version == VERSION_SEGMENTED:
+            return _verify_segmented(fin, size, password, full, threads, progress)
+        if version == VERSION_PACK:
+            fin.seek(0)
+            return _verify_pack(fin, password, full, threads, progress)
+        if version not in (None, VERSION_SESSION):
+            raise EngineError(f"unsupported format version {version}")
+        key, iv = _cbc_key(fin, head, password)
+        _cbc_precheck(fin, key)
+        name = "CBC session" if version else "CBC"
+        if not full:
+            return f"{name}, no MAC: padding of the last block OK (quick check)"
+        reader = _ProgressReader(fin, progress, size)
+        reader.done = fin.tell()
+        with _Cipher(False, key, iv) as c:
+            for chunk in _file_chunks(reader, buffer_size):
+                c.update(chunk)
+            c.final()
+        reader.finish()
+        return f"{name}, no MAC: decrypted in full, padding OK"
+
+# Exit code for a run stopped by its cancel event (as after Ctrl-C in a shell).
+EXIT_CANCELLED = 130
+
+TOOLS = {
+    "encryptor": (encrypt_file, "Encryption completed!"),
+    "decryptor": (decrypt_file, "Decryption completed!"),
+    "packer": (pack_dir, "Pack completed!"),
+    "unpacker": (unpack_dir, "Unpack completed!"),
+    "verifier": (verify_file, "Verification passed!"),
+}
+
+def run_args(args, password, emit=None, **options):
+    # Drop-in for running [tool, [-b size] [-r] [-g], input, output] as a
+    # subprocess: same argv, same completion message and PROGRESS records,
+    # returns an exit code. Engine-only options (e.g. session=True) are passed
+    # through to the tool function. -r (no mmap) has no meaning here and is
+    # accepted as a no-op. The verifier has no C counterpart and takes just
+    # the input; its summary line is emitted before the completion message.
+    # cancel (a threading.Event) is checked at every progress point; once set
+    # the tool stops, removes its partial output (a resumable encryption
+    # keeps its checkpoint) and EXIT_CANCELLED is returned.
+    emit = emit or (lambda line: None)
+    cancel = options.pop("cancel", None)
+    name = os.path.splitext(os.path.basename(args[0]))[0]
+    paths = []
+    rest = iter(args[1:])
+    try:
+        for arg in rest:
+            if arg == "-b":
+                options["buffer_size"] = parse_size(next(rest))
+            elif arg == "-g":
+                options["progress"] = lambda done, total: emit(f"PROGRESS {done} {total}\n")
+            elif arg != "-r":
+                paths.append(arg)
+    except (StopIteration, ValueError):
+        paths = []
+    if name not in TOOLS or len(paths) != (1 if name == "verifier" else 2):
+        emit(f"Usage: {name} [-b buffer_size] [-r] [-g] <input>" + ("" if name == "verifier" else " <output>") + "\n")
+        return 1
+    if cancel is not None:
+        report = options.get("progress")
+        def progress(done, total):
+            if cancel.is_set():
+                raise Cancelled("cancelled")
+            if report:
+                report(done, total)
+        options["progress"] = progress
+        if cancel.is_set():
+            emit("Cancelled\n")
+            return EXIT_CANCELLED
+    func, done = TOOLS[name]
+    resumable = options.get("resume") and name == "encryptor"
+    offset = resumable and resume_offset(*paths)
+    if offset:
+        emit(f"Resuming at {offset / 1e6:.1f} MB\n")
+    try:
+        result = func(*paths, password or "", **options)
+    except (EngineError, OSError) as e:
+        emit("Cancelled\n" if isinstance(e, Cancelled) else f"Error: {e}\n")
+        offset = resumable and resume_offset(*paths)
+        if offset:
+            emit(f"Checkpoint kept at {offset / 1e6:.1f} MB; resume to continue\n")
+        return EXIT_CANCELLED if isinstance(e, Cancelled) else 1
+    if isinstance(result, str):
+        emit(result + "\n")
+    elif options.get("compress") and result:
+        nin, nout = result
+        emit(f"Compression: {nin / 1e6:.2f} MB -> {nout / 1e6:.2f} MB ({nin / max(nout, 1):.2f}x)\n")
+    emit(done + "\n")
+    return 0
@@ -0,0 +1,620 @@
+import os, re, glob, json, time, hashlib, threading, subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import engine
+
+# Job logic shared by the dashboard (dashboard.py) and the command line
+# (encryd.py): binary lookup, argv building, running one encryptor/decryptor
+# invocation as a subprocess or in-process, and the batch scheduler. Nothing
+# here imports Qt; the dashboard's QThread workers are thin wrappers that turn
+# the callbacks into signals.
+
+BIN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+# "PROGRESS <done> <total>" records from the tools' -g flag; the prompt may
+# share the line since it has no newline.
+PROGRESS_RE = re.compile(r"PROGRESS (\d+) (\d+)\s*$")
+PROGRESS_INTERVAL = 0.1
+# Seconds a cancelled binary gets to exit after SIGTERM before SIGKILL.
+CANCEL_GRACE = 2.0
+EXIT_CANCELLED = engine.EXIT_CANCELLED
+
+def get_bin(name):
+    exe = os.path.join(BIN_DIR, name)
+    if os.name == 'nt':
+        exe += ".exe"
+    return exe
+
+# The C tools and their sources, for the startup staleness check.
+SOURCES = {"encryptor": "encryptor_aes.c", "decryptor": "decryptor_aes.c"}
+
+def stale_binaries():
+    # Tools whose binary is missing or older than its source, the Makefile or
+    # output/.flags, or all of them when .flags (written by make, starting
+    # with the profile) shows anything but a release build: a `make debug`
+    # or an older Makefile without profiles. A few stat calls and one small
+    # read, cheap enough for startup; make decides what to recompile.
+    root = os.path.dirname(BIN_DIR)
+    stamp = os.path.join(BIN_DIR, ".flags")
+    try:
+        with open(stamp) as f:
+            release = f.read().startswith("release:")
+    except OSError:
+        release = False
+    stale = []
+    for tool, src in SOURCES.items():
+        src = os.path.join(root, src)
+        if not os.path.exists(src):
+            continue  # prebuilt binaries shipped without sources
+        try:
+            built = os.stat(get_bin(tool)).st_mtime_ns
+            newest = max(os.stat(p).st_mtime_ns for p in (src, os.path.join(root, "Makefile"), stamp))
+        except OSError:
+            stale.append(tool)
+            continue
+        if newest > built or not release:
+            stale.append(tool)
+    return stale
+
+def encrypt_output(outfile):
+    # Always output .bin for encryption (stdout stays stdout)
+    return outfile if outfile == "-" or outfile.lower().endswith('.bin') else outfile + '.bin'
+
+def decrypt_output(path):
+    return path[:-4] if path.lower().endswith('.bin') else path + '.dec'
+
+def tool_args(tool, infile, outfile, flags=(), progress=False):
+    return [get_bin(tool), *(["-g"] if progress else []), *flags, infile, outfile]
+
+def describe_exit(code):
+    if code == EXIT_CANCELLED:
+        return "[Cancelled]"
+    return "[Success]" if code == 0 else "[Failed. Exit code: %s]" % code
+
+def probe_report(result=None):
+    # Human-readable lines for engine.probe(), shared by the CLI and the
+    # dashboard.
+    result = result or engine.probe()
+    lines = [
+        f"OpenSSL:      {result['openssl']}",
+        f"CPU features: {' '.join(result['cpu_features']) or 'unknown'}",
+        f"AES in hardware: {'yes' if result['aes_hardware'] else 'no'}",
+    ]
+    for mode, rate in result["throughput_mb_s"].items():
+        lines.append(f"  {mode:<12} {rate:9.1f} MB/s (1 thread)")
+    lines.append(f"Recommended mode: {result['recommended']}")
+    return lines
+
+class ProgressFilter:
+    # Splits tool output into text lines and (done, total) progress records,
+    # passing on at most one record per interval plus the final one.
+    def __init__(self, on_output, on_progress=None, interval=PROGRESS_INTERVAL):
+        self.on_output = on_output
+        self.on_progress = on_progress
+        self.interval = interval
+        self._last = 0.0
+    def __call__(self, line):
+        m = PROGRESS_RE.search(line)
+        if not m:
+            self.on_output(line)
+            return
+        if line[:m.start()].strip():
+            self.on_output(line[:m.start()])
+        done, total = int(m.group(1)), int(m.group(2))
+        now = time.monotonic()
+        if self.on_progress and (now - self._last >= self.interval or done == total):
+            self._last = now
+            self.on_progress(done, total)
+
+def _remove_partial(path):
+    # a binary stopped mid-run leaves a truncated output behind
+    if path != "-" and os.path.isfile(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+class ToolJob:
+    # One [tool, flags..., input, output] invocation that another thread can
+    # stop with cancel(): the engine checks the flag at each progress point, a
+    # binary gets SIGTERM and, if still running CANCEL_GRACE seconds later,
+    # SIGKILL. The partial output is removed and run() returns
+    # EXIT_CANCELLED. run_async() is the same for an asyncio event loop,
+    # where the binary's output pipe is watched by the loop instead of a
+    # blocked thread.
+    def __init__(self, args, password=None, on_line=None, in_process=False, options=None):
+        self.args = args
+        self.password = password
+        self.on_line = on_line or (lambda line: None)
+        self.in_process = in_process
+        self.options = options or {}
+        self.cancelled = threading.Event()
+        self._proc = None
+        self._lock = threading.Lock()
+    def cancel(self, grace=CANCEL_GRACE):
+        with self._lock:
+            self.cancelled.set()
+            p = self._proc
+        if p is not None and p.poll() is None:
+            p.terminate()
+            timer = threading.Timer(grace, lambda: p.poll() is None and p.kill())
+            timer.daemon = True
+            timer.start()
+    def _spawn(self, text):
+        with self._lock:
+            if self.cancelled.is_set():
+                return None
+            self._proc = p = subprocess.Popen(
+                self.args,
+                stdin=subprocess.PIPE if self.password else None,
+                stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                bufsize=1 if text else -1, universal_newlines=text,
+            )
+        if self.password:
+            p.stdin.write(self.password + "\n" if text else (self.password + "\n").encode())
+            p.stdin.close()
+        return p
+    def _result(self, code):
+        if code != 0 and self.cancelled.is_set():
+            if code is not None:
+                _remove_partial(self.args[-1])
+            self.on_line("Cancelled\n")
+            return EXIT_CANCELLED
+        return code
+    def run(self):
+        if self.in_process:
+            return engine.run_args(self.args, self.password, self.on_line, cancel=self.cancelled, **self.options)
+        try:
+            p = self._spawn(text=True)
+            if p is None:
+                return self._result(None)
+            for line in p.stdout:
+                self.on_line(line)
+            return self._result(p.wait())
+        except Exception as e:
+            if self.cancelled.is_set():
+                return self._result(-1)
+            self.on_line(f"Error: {e}\n")
+            return -1
+    async def run_async(self, executor=None):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self.in_process:
+            return await loop.run_in_executor(executor, self.run)
+        try:
+            p = self._spawn(text=False)
+            if p is None:
+                return self._result(None)
+            reader = asyncio.StreamReader(limit=1 << 20)
+            transport, _ = await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), p.stdout)
+            try:
+                async for line in reader:
+                    self.on_line(line.decode(errors="replace"))
+            finally:
+                transport.close()
+            # the tools exit right after closing stdout
+            while p.poll() is None:
+                await asyncio.sleep(0.005)
+            return self._result(p.returncode)
+        except Exception as e:
+            if self.cancelled.is_set():
+                return self._result(-1)
+            self.on_line(f"Error: {e}\n")
+            return -1
+
+def run_tool(args, password=None, on_line=None, in_process=False, options=None):
+    # Runs [tool, flags..., input, output] and returns its exit code, feeding
+    # each output line to on_line. in_process=True runs the same argv through
+    # the engine instead of spawning the binary. Use ToolJob to be able to
+    # cancel it.
+    return ToolJob(args, password, on_line, in_process, options).run()
+
+class BatchJob:
+    def __init__(self, src, dst, rel=None):
+        self.src = src
+        self.dst = dst
+        self.rel = rel or os.path.basename(src)
+        self.status = "queued"
+        self.attempts = 0
+        self.size = 0
+        self.output = ""
+
+def expand_inputs(pattern):
+    # Folder -> every file below it, glob -> its matches, plain path -> itself.
+    # Returns (root, files) where root is what relative output paths hang off.
+    if os.path.isdir(pattern):
+        files = []
+        for dirpath, _, names in os.walk(pattern):
+            for n in sorted(names):
+                if not n.startswith(MANIFEST_NAME) and engine.RESUME_SUFFIX not in n:
+                    files.append(os.path.join(dirpath, n))
+        return pattern, sorted(files)
+    if glob.has_magic(pattern):
+        files = [f for f in glob.glob(pattern, recursive=True) if os.path.isfile(f)]
+        parts = pattern.split(os.sep)
+        n = next(i for i, part in enumerate(parts) if glob.has_magic(part))
+        root = os.sep.join(parts[:n]) or ("/" if pattern.startswith(os.sep) else ".")
+        return root, sorted(files)
+    return os.path.dirname(pattern) or ".", [pattern]
+
+def is_batch_input(path):
+    return os.path.isdir(path) or glob.has_magic(path)
+
+def build_jobs(pattern, outdir, suffix_fn):
+    root, files = expand_inputs(pattern)
+    jobs = []
+    for f in files:
+        rel = os.path.relpath(f, root)
+        jobs.append(BatchJob(f, os.path.join(outdir, suffix_fn(rel)), rel))
+    return jobs
+
+MANIFEST_NAME = ".encryd-manifest"
+
+def file_hash(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+def _fsync(path):
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _fsync_output(path):
+    # the file's data, then the directory entry that names it
+    _fsync(path)
+    if os.name != 'nt':
+        _fsync(os.path.dirname(path) or ".")
+
+class Manifest:
+    # Record of what an incremental batch has already encrypted into outdir:
+    # one JSON line per source ({"p": rel path, "s": size, "m": mtime_ns,
+    # "h": blake2b}) in MANIFEST_NAME. Finished jobs are appended to a
+    # journal as they complete, so an interrupted run keeps everything it
+    # finished and never records a half-written output: record() fsyncs the
+    # output (and its directory) before journaling it, so a durable entry
+    # never points at data still in the page cache. commit() folds the
+    # journal into a new manifest with write-fsync-rename.
+    def __init__(self, outdir):
+        self.path = os.path.join(outdir, MANIFEST_NAME)
+        self.journal_path = self.path + ".journal"
+        self.entries = {}
+        self._lock = threading.Lock()
+        self._journal = None
+        self._dirty = False
+        for path in (self.path, self.journal_path):
+            self._load(path)
+    def _load(self, path):
+        try:
+            f = open(path)
+        except FileNotFoundError:
+            return
+        with f:
+            for line in f:
+                try:
+                    e = json.loads(line)
+                    self.entries[e["p"]] = (e["s"], e["m"], e["h"])
+                except (ValueError, KeyError):
+                    pass  # torn last line from an interrupted run
+    def unchanged(self, job, st):
+        # The fast path: same size and mtime as recorded and the output is
+        # still there. No file contents are read.
+        old = self.entries.get(job.rel)
+        return bool(old) and old[:2] == (st.st_size, st.st_mtime_ns) and os.path.exists(job.dst)
+    def check(self, job, st):
+        # Returns (skip, hash) for a file that failed unchanged(): the
+        # content is hashed, so a touched but unmodified file is still
+        # skipped (and its new mtime recorded).
+        old = self.entries.get(job.rel)
+        if not os.path.exists(job.dst):
+            old = None
+        digest = file_hash(job.src)
+        if old and old[0] == st.st_size and old[2] == digest:
+            self.record(job, st, digest)
+            return True, digest
+        return False, digest
+    def record(self, job, st, digest):
+        _fsync_output(job.dst)
+        line = json.dumps({"p": job.rel, "s": st.st_size, "m": st.st_mtime_ns, "h": digest}) + "\n"
+        with self._lock:
+            self.entries[job.rel] = (st.st_size, st.st_mtime_ns, digest)
+            self._dirty = True
+            if self._journal is None:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._journal = open(self.journal_path, "a")
+            self._journal.write(line)
+            self._journal.flush()
+    def commit(self, keep=None):
+        # keep: rel paths still present; entries for anything else are
+        # dropped (only pass it after a complete run).
+        with self._lock:
+            if self._journal:
+                self._journal.close()
+                self._journal = None
+            if keep is not None and len(keep) < len(self.entries):
+                self.entries = {rel: e for rel, e in self.entries.items() if rel in keep}
+                self._dirty = True
+            if not self._dirty and not os.path.exists(self.journal_path):
+                return
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                for rel, (size, mtime, digest) in self.entries.items():
+                    f.write(json.dumps({"p": rel, "s": size, "m": mtime, "h": digest}) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            if os.name != 'nt':
+                _fsync(os.path.dirname(self.path) or ".")
+            if os.path.exists(self.journal_path):
+                os.remove(self.journal_path)
+            self._dirty = False
+
+class Batch:
+    # Runs jobs across a bounded pool of concurrent tool invocations (sized
+    # to the CPU count), retrying failures and reporting per-job status via
+    # on_job(index, status) and summary text via on_output(line). With a
+    # Manifest, unchanged sources are skipped and finished ones recorded.
+    # cancel() stops running jobs and leaves queued ones unstarted.
+    def __init__(self, tool, jobs, password, workers=None, retries=1, in_process=False,
+                 options=None, flags=None, on_output=None, on_job=None, manifest=None):
+        self.tool = tool
+        self.flags = flags or []
+        self.in_process = in_process
+        self.options = options or {}
+        self.jobs = jobs
+        self.password = password
+        self.workers = workers or os.cpu_count() or 1
+        self.retries = retries
+        self.on_output = on_output or (lambda line: None)
+        self.on_job = on_job or (lambda idx, status: None)
+        self.manifest = manifest
+        self.cancelled = threading.Event()
+        self._active = set()
+        self._lock = threading.Lock()
+    def cancel(self):
+        with self._lock:
+            self.cancelled.set()
+            active = list(self._active)
+        for tool in active:
+            tool.cancel()
+    def _tool_job(self, job, lines):
+        # Registers a ToolJob for job so cancel() reaches it; None once
+        # cancelled.
+        tool = ToolJob([self.tool, *self.flags, job.src, job.dst], self.password, lines.append,
+                       self.in_process, self.options)
+        with self._lock:
+            if self.cancelled.is_set():
+                return None
+            self._active.add(tool)
+        return tool
+    def _run_once(self, job):
+        lines = []
+        tool = self._tool_job(job, lines)
+        if tool is None:
+            return EXIT_CANCELLED
+        try:
+            return tool.run()
+        finally:
+            with self._lock:
+                self._active.discard(tool)
+            job.output = "".join(lines)
+    def _prepare(self, idx):
+        # Returns (stat, digest) for a job to run, or None when it is
+        # skipped (unchanged) or cancelled before starting.
+        job = self.jobs[idx]
+        if self.cancelled.is_set():
+            job.status = "cancelled"
+            return None
+        os.makedirs(os.path.dirname(job.dst) or ".", exist_ok=True)
+        st = digest = None
+        try:
+            st = os.stat(job.src)
+            job.size = st.st_size
+        except OSError:
+            job.size = 0
+        if self.manifest and st:
+            skip, digest = self.manifest.check(job, st)
+            if skip:
+                job.status = "skipped"
+                return None
+        return st, digest
+    def _start_attempt(self, idx):
+        job = self.jobs[idx]
+        job.attempts += 1
+        job.status = "running"
+        self.on_job(idx, job.status)
+    def _attempt_done(self, idx, code, st, digest):
+        # Settles one attempt's exit code; False means retry.
+        job = self.jobs[idx]
+        if code == 0:
+            job.status = "ok"
+            if self.manifest and st:
+                self.manifest.record(job, st, digest)
+        elif code == EXIT_CANCELLED or self.cancelled.is_set():
+            job.status = "cancelled"
+        elif job.attempts > self.retries:
+            job.status = "failed"
+        else:
+            job.status = "retry"
+            self.on_job(idx, job.status)
+            return False
+        return True
+    def _run_job(self, idx):
+        prepared = self._prepare(idx)
+        if prepared:
+            while True:
+                self._start_attempt(idx)
+                if self._attempt_done(idx, self._run_once(self.jobs[idx]), *prepared):
+                    break
+        self.on_job(idx, self.jobs[idx].status)
+        return idx
+    def _dispatch(self, todo, finished):
+        # Runs the jobs in todo, calling finished(index) as each one ends.
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            futures = [pool.submit(self._run_job, i) for i in todo]
+            for fut in as_completed(futures):
+                finished(fut.result())
+    def run(self):
+        total = len(self.jobs)
+        self.on_output(f"Batch: {total} jobs on {self.workers} workers\n")
+        start = time.monotonic()
+        counts = {"ok": 0, "failed": 0, "skipped": 0, "cancelled": 0}
+        nbytes = 0
+        todo = range(total)
+        if self.manifest:
+            # decide the common case here, without a pool task per file
+            todo = []
+            for i, job in enumerate(self.jobs):
+                try:
+                    unchanged = self.manifest.unchanged(job, os.stat(job.src))
+                except OSError:
+                    unchanged = False
+                if unchanged:
+                    job.status = "skipped"
+                    counts["skipped"] += 1
+                    self.on_job(i, job.status)
+                else:
+                    todo.append(i)
+
+        def finished(idx):
+            nonlocal nbytes
+            job = self.jobs[idx]
+            counts[job.status] += 1
+            if job.status == "ok":
+                nbytes += job.size
+            elif job.status == "failed":
+                self.on_output(f"[FAILED] {job.src}: {job.output.strip()}\n")
+
+        try:
+            self._dispatch(todo, finished)
+        finally:
+            if self.manifest:
+                complete = sum(counts.values()) == total and not counts["cancelled"]
+                self.manifest.commit({job.rel for job in self.jobs} if complete else None)
+        elapsed = max(time.monotonic() - start, 1e-9)
+        ok = counts["ok"]
+        cancelled = f", {counts['cancelled']} cancelled" if counts["cancelled"] else ""
+        self.on_output(
+            f"Done: {ok}/{total} ok, {counts['failed']} failed, {counts['skipped']} unchanged{cancelled} "
+            f"in {elapsed:.2f}s ({ok / elapsed:.1f} files/s, {nbytes / elapsed / 1e6:.2f} MB/s)\n"
+        )
+        if counts["cancelled"]:
+            return EXIT_CANCELLED
+        return 1 if counts["failed"] else 0
+
+class AsyncBatch(Batch):
+    # Batch on one asyncio event loop: each binary runs as a subprocess whose
+    # output pipe the loop watches, so `workers` can be in the hundreds
+    # without a thread per running job. In-process jobs and manifest hashing
+    # still need threads and share a pool capped at the CPU count.
+    def _dispatch(self, todo, finished):
+        import asyncio  # only here: it adds ~40 ms to every import of jobs
+        asyncio.run(self._dispatch_async(todo, finished))
+    async def _dispatch_async(self, todo, finished):
+        import asyncio
+        threads = ThreadPoolExecutor(max_workers=min(self.workers, os.cpu_count() or 1))
+        queue = iter(todo)
+        async def worker():
+            for idx in queue:
+                finished(await self._run_job_async(idx, threads))
+        try:
+            await asyncio.gather(*(worker() for _ in range(min(self.workers, len(todo)))))
+        finally:
+            threads.shutdown()
+    async def _run_job_async(self, idx, threads):
+        import asyncio
+        loop = asyncio.get_running_loop()
+        if self.manifest:
+            prepared = await loop.run_in_executor(threads, self._prepare, idx)
+        else:
+            prepared = self._prepare(idx)
+        if prepared:
+            while True:
+                self._start_attempt(idx)
+                code = await self._run_once_async(self.jobs[idx], threads)
+                # with a manifest, settling fsyncs the output: keep it off the loop
+                if self.manifest:
+                    done = await loop.run_in_executor(threads, self._attempt_done, idx, code, *prepared)
+                else:
+                    done = self._attempt_done(idx, code, *prepared)
+                if done:
+                    break
+        self.on_job(idx, self.jobs[idx].status)
+        return idx
+    async def _run_once_async(self, job, threads):
+        lines = []
+        tool = self._tool_job(job, lines)
+        if tool is None:
+            return EXIT_CANCELLED
+        try:
+            return await tool.run_async(threads)
+        finally:
+            with self._lock:
+                self._active.discard(tool)
+            job.output = "".join(lines)
+
+# Programmatic API. in_process=None picks the engine when libcrypto is
+# available and the binaries otherwise; engine-only options (session,
+# a mode other than "cbc", compress, resume) need the engine.
+
+def _in_process(in_process, options):
+    if options.get("mode") == "cbc":
+        del options["mode"]  # the binaries' own format
+    if in_process is None:
+        in_process = engine.available()
+    if options and not in_process:
+        raise ValueError(f"{', '.join(sorted(options))}: these options need the in-process engine")
+    return in_process
+
+def encrypt(infile, outfile, password, flags=(), in_process=None, on_line=None, on_progress=None, **options):
+    in_process = _in_process(in_process, options)
+    args = tool_args("encryptor", infile, encrypt_output(outfile), flags, progress=on_progress is not None)
+    return run_tool(args, password, ProgressFilter(on_line or (lambda line: None), on_progress), in_process, options)
+
+def decrypt(infile, outfile, password, flags=(), in_process=None, on_line=None, on_progress=None, **options):
+    in_process = _in_process(in_process, options)
+    args = tool_args("decryptor", infile, outfile, flags, progress=on_progress is not None)
+    return run_tool(args, password, ProgressFilter(on_line or (lambda line: None), on_progress), in_process, options)
+
+def batch(op, pattern, outdir, password, flags=(), in_process=None, workers=None, retries=1,
+          on_output=None, on_job=None, incremental=False, use_asyncio=False, **options):
+    # op is "encrypt" or "decrypt"; pattern is a folder or glob.
+    # incremental=True keeps a Manifest in outdir and skips unchanged files.
+    # use_asyncio=True runs the jobs on an event loop (AsyncBatch), for
+    # hundreds of concurrent binaries without a thread each.
+    in_process = _in_process(in_process, options)
+    if op == "encrypt":
+        tool, name = "encryptor", lambda rel: rel + '.bin'
+    elif op == "decrypt":
+        tool, name = "decryptor", decrypt_output
+    else:
+        raise ValueError(f"unknown operation {op!r}")
+    manifest = Manifest(outdir) if incremental else None
+    runner = (AsyncBatch if use_asyncio else Batch)(get_bin(tool), build_jobs(pattern, outdir, name), password, workers, retries,
+                   in_process, options, list(flags), on_output, on_job, manifest)
+    return runner.run()
+
+# Pack containers (one encrypted file for a whole tree) exist only in the
+# engine, so these always run in-process.
+
+def pack(src_dir, outfile, password, flags=(), on_line=None, on_progress=None, **options):
+    args = tool_args("packer", src_dir, encrypt_output(outfile), flags, progress=on_progress is not None)
+    return run_tool(args, password, ProgressFilter(on_line or (lambda line: None), on_progress), True, options)
+
+def unpack(archive, outdir, password, members=None, flags=(), on_line=None, on_progress=None, **options):
+    # members limits extraction to those paths; only their chunks are read.
+    if members:
+        options["members"] = list(members)
+    args = tool_args("unpacker", archive, outdir, flags, progress=on_progress is not None)
+    return run_tool(args, password, ProgressFilter(on_line or (lambda line: None), on_progress), True, options)
+
+def verify(infile, password, full=False, flags=(), on_line=None, on_progress=None):
+    # Checks that infile (any engine or C tool format) decrypts under password
+    # without writing an output; the summary line goes to on_line. The quick
+    # check reads only the header and tail, full=True authenticates every
+    # segment. Always in-process: the binaries have no verify mode.
+    args = [get_bin("verifier"), *(["-g"] if on_progress is not None else []), *flags, infile]
+    return run_tool(args, password, ProgressFilter(on_line or (lambda line: None), on_progress), True, {"full": full})